@@ -1,9 +1,14 @@
 import pandas as pd
+import sys
+from pathlib import Path
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix
 from sklearn.preprocessing import LabelEncoder
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from data_pipeline.time_features import parse_creation_dates, time_features
+
 
 df = pd.read_csv("Pyt\\data\\SR2025.csv", encoding="latin1", on_bad_lines="skip")
 df.columns = df.columns.str.strip()  # Clean column names
@@ -25,10 +30,11 @@ for col in cols_to_encode:
 df_encoded = pd.get_dummies(df[cols_to_encode], drop_first=True)
 
 
-df['Month'] = pd.to_datetime(df['Creation Date'], errors='coerce').dt.month
-df['Weekday'] = pd.to_datetime(df['Creation Date'], errors='coerce').dt.dayofweek
-df['Hour'] = pd.to_datetime(df['Creation Date'], errors='coerce').dt.hour
-numeric_features = df[['Month', 'Weekday', 'Hour']]
+# Parse the dates once and derive all three features from the parsed values
+features = time_features(parse_creation_dates(df['Creation Date']))
+numeric_features = pd.DataFrame(
+    {name: features[name] for name in ['Month', 'Weekday', 'Hour']}, index=df.index
+)
 
 
 X = pd.concat([df_encoded, numeric_features], axis=1)
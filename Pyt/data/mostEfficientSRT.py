@@ -1,40 +1,24 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-# Load data
-df = pd.read_csv("Pyt/data/SR2025.csv", encoding="latin1", on_bad_lines='skip')
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from data_pipeline.analysis import completion_rates, load_requests
 
-# Initialize dictionary to track each Service Request Type
-sr_types = {}
+# Types with fewer requests than this are too small to rank fairly
+MIN_REQUESTS = 50
 
-# Iterate through the rows
-for index, row in df.iterrows():
-    sr_type = row["Service Request Type"]
-    status = row["Status"]
+# Only "Completed" counts as done here, as in the original ranking
+RANKED_STATUSES = ("Completed",)
 
-    if sr_type not in sr_types:
-        sr_types[sr_type] = {"Cases": 0, "Completed": 0}
+df = load_requests()
 
-    sr_types[sr_type]["Cases"] += 1
-    if status == "Completed":
-        sr_types[sr_type]["Completed"] += 1
-
-# Calculate efficiency and find most efficient SR Type
-most_efficient_type = None
-highest_efficiency = -1
-
-for sr_type, stats in sr_types.items():
-    cases = stats["Cases"]
-    completed = stats["Completed"]
-
-    if cases > 0:
-        efficiency = completed / cases
-        sr_types[sr_type]["Efficiency"] = efficiency
-
-        if efficiency > highest_efficiency:
-            highest_efficiency = efficiency
-            most_efficient_type = sr_type
-    else:
-        sr_types[sr_type]["Efficiency"] = None
+# Requests, completed requests and completion rate per Service Request Type
+sr_types = completion_rates(df, 'service_type', min_requests=MIN_REQUESTS, completed_statuses=RANKED_STATUSES)
 
 # Print result
-print(f"Most efficient SR Type: {most_efficient_type} with {highest_efficiency:.2%} efficiency")
+if sr_types.empty:
+    print(f"No SR Type has at least {MIN_REQUESTS} requests")
+else:
+    most_efficient_type = sr_types.index[0]
+    highest_efficiency = sr_types['completion_rate'].iloc[0]
+    print(f"Most efficient SR Type: {most_efficient_type} with {highest_efficiency:.2%} efficiency")
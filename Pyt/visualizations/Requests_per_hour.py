@@ -1,21 +1,18 @@
-import pandas as pd
 import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
 
-df = pd.read_csv("Pyt\data\SR2025.csv", encoding="latin1",on_bad_lines='skip')
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from data_pipeline.aggregation import Dimension, count_groups
+from data_pipeline.analysis import load_requests
 
-hours = {"00:00": 0, "01:00": 0,"02:00": 0,"03:00": 0,"04:00": 0,"05:00": 0,"06:00": 0,"07:00": 0,"08:00": 0,"09:00": 0,"10:00": 0,"11:00": 0,"12:00": 0,"13:00": 0,"14:00": 0,"15:00": 0,"16:00": 0,"17:00": 0,"18:00": 0,"19:00": 0,"20:00": 0,"21:00": 0,"22:00": 0,"23:00": 0}
+df = load_requests()
 
-def get_hour(Creation_date):
-    hour = Creation_date[11:13]
-    string = f"{hour}:00"
-    hours[string] +=1
+hours = count_groups(df, [Dimension('hour', 'Hour', kind='int', size=24)])['hour']
 
-for x in df["Creation Date"]:
-    get_hour(x)
 
-
-x = list(hours.keys())
-y = list(hours.values())
+x = [f"{hour:02d}:00" for hour in hours.index]
+y = hours.tolist()
 
 plt.plot(x, y, marker='o')  
 plt.title("Hourly Data")
@@ -1,33 +1,21 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-df = pd.read_csv("Pyt\data\SR2025.csv", encoding="latin1",on_bad_lines='skip')
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from data_pipeline.aggregation import Dimension, count_groups, top_counts
+from data_pipeline.analysis import completion_rates, load_requests
 
-df = pd.read_csv("Pyt\data\SR2025.csv", encoding="latin1",on_bad_lines='skip')
-ward_counts = df['Ward'].dropna().value_counts().sort_values(ascending=False)
+# Wards with fewer requests than this are left out of the ranking
+MIN_REQUESTS = 50
 
-print(ward_counts)
-for x in ward_counts:
-    print(x)
-"""
-wards = {}
-
-print(df["Ward"].unique())
-
-for y in range(3):
-    for x in df["Ward"].unique():
-        print(x)
-        wards[x["count"]] = 0
-        wards[x["completion"]] = 0
+# Completion here means status "Completed" only, as this report always used
+RANKED_STATUSES = ("Completed",)
 
-print(wards)
-"""
+df = load_requests()
 
-"""
-print(df["Status"][2])
-
-
-for ward,index in enumerate(df["Ward"]):
-    if df["Status"][index] == 'Completed':
-        wards[ward] += 1
+ward_counts = top_counts(count_groups(df, [Dimension('ward', 'Ward')])['ward'])
+print(ward_counts)
 
-"""
\ No newline at end of file
+# Wards ranked by the share of their requests that were completed
+wards = completion_rates(df, 'ward', min_requests=MIN_REQUESTS, completed_statuses=RANKED_STATUSES)
+print(wards.to_string(formatters={'completion_rate': '{:.2%}'.format}))
@@ -1,35 +1,22 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-wards = {}
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from data_pipeline.analysis import most_efficient, load_requests
 
-df = pd.read_csv("Pyt/data/SR2025.csv", encoding="latin1", on_bad_lines='skip')
+# Wards with fewer requests than this are too small to rank fairly
+MIN_REQUESTS = 50
 
-for index, row in df.iterrows():
-    ward = row["Service Request Type"]
-    status = row["Status"]
+# Keeps the original ranking: "Closed" requests do not count as completed
+RANKED_STATUSES = ("Completed",)
 
-    if ward not in wards:
-        wards[ward] = {"Cases": 0, "Completed": 0}
+df = load_requests()
 
-    wards[ward]["Cases"] += 1
-    if status == "Completed":
-        wards[ward]["Completed"] += 1
+most_efficient_ward, highest_efficiency = most_efficient(
+    df, 'ward', min_requests=MIN_REQUESTS, completed_statuses=RANKED_STATUSES
+)
 
-# Calculate efficiencies
-most_efficient_ward = None
-highest_efficiency = -1
-
-for ward, stats in wards.items():
-    cases = stats["Cases"]
-    completed = stats["Completed"]
-    
-    if cases > 0:
-        efficiency = completed / cases
-        stats["Efficiency"] = efficiency
-        if efficiency > highest_efficiency:
-            highest_efficiency = efficiency
-            most_efficient_ward = ward
-    else:
-        stats["Efficiency"] = None
-
-print(f"Most efficient ward: {most_efficient_ward} with {highest_efficiency:.2%} efficiency")
\ No newline at end of file
+if most_efficient_ward is None:
+    print(f"No ward has at least {MIN_REQUESTS} requests")
+else:
+    print(f"Most efficient ward: {most_efficient_ward} with {highest_efficiency:.2%} efficiency")
@@ -1,10 +1,15 @@
-import pandas as pd
 import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from data_pipeline.aggregation import Dimension, count_groups, top_counts
+from data_pipeline.analysis import load_requests
 
-df = pd.read_csv("Pyt\data\SR2025.csv", encoding="latin1",on_bad_lines='skip')
 
-status_counts = df['Status'].value_counts()
+df = load_requests()
+
+status_counts = top_counts(count_groups(df, [Dimension('status', 'Status')])['status'])
 
 
 status_counts.plot(kind='bar', color=['green', 'red', 'gray', 'orange'])
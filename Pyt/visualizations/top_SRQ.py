@@ -1,11 +1,14 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+import sys
+from pathlib import Path
 
-df = pd.read_csv("Pyt\data\SR2025.csv", encoding="latin1",on_bad_lines='skip')
-top_20 = df['Service Request Type'].value_counts().head(20)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from data_pipeline.aggregation import Dimension, count_groups, top_counts
+from data_pipeline.analysis import load_requests
 
-top_20_requests = df['Service Request Type'].value_counts().head(20)
+df = load_requests()
+top_20_requests = top_counts(count_groups(df, [Dimension('service', 'Service Request Type')])['service'], 20)
 
 
 plt.figure(figsize=(12, 8))
@@ -1,10 +1,15 @@
 import matplotlib.pyplot as plt
 import seaborn as sns
-import pandas as pd
+import sys
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from data_pipeline.aggregation import Dimension, count_groups, top_counts
+from data_pipeline.analysis import load_requests
 
-df = pd.read_csv("Pyt\data\SR2025.csv", encoding="latin1",on_bad_lines='skip')
-ward_counts = df['Ward'].dropna().value_counts().sort_values(ascending=False)
+
+df = load_requests()
+ward_counts = top_counts(count_groups(df, [Dimension('ward', 'Ward')])['ward'])
 
 
 plt.figure(figsize=(12, 8))
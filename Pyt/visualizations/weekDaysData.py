@@ -1,37 +1,19 @@
-import pandas as pd
-import seaborn as sns
-from datetime import datetime
+import sys
+from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from data_pipeline.aggregation import Dimension, count_groups
+from data_pipeline.analysis import load_requests
 
-df = pd.read_csv("Pyt\data\SR2025.csv", encoding="latin1",on_bad_lines='skip')
 
-week_days = {"Sunday":0, "Monday":0,"Tuesday":0,"Wednesday":0,"Thursday":0,"Friday":0,"Saturday":0,}
+df = load_requests()
 
-def get_day(Creation_Date):
-    date = (Creation_Date.strip())[0:10].strip()
-    date_obj = datetime.strptime(date,"%Y-%m-%d")
-    day_of_week = date_obj.strftime("%A")
-    return day_of_week
-
-for dates in df["Creation Date"]:
-    week_days[get_day(dates)] += 1
-    print("DOING")
+# Weekday is 0 for Monday; daysData.txt lists the days from Sunday
+weekday_counts = count_groups(df, [Dimension('weekday', 'Weekday', kind='int', size=7)])['weekday']
+day_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+week_days = {name: int(weekday_counts[index]) for index, name in enumerate(day_names)}
+week_days = {"Sunday": week_days.pop("Sunday"), **week_days}
 
 with open("daysData.txt",'w') as f:
     for day in week_days:
         f.write(f"{day} {week_days.get(day)}" + "\n")
-        
-    f.close()
-
-
-
-
-
-
-
-
-    
-
-
-
-
@@ -1,65 +1,246 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import json
-import joblib
-import pandas as pd
 import numpy as np
 from datetime import datetime
+import hmac
+import os
+import sqlite3
 from pathlib import Path
+import sys
+import threading
+import time
 import traceback
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from backend.metrics import Metrics
+from backend.precompressed import PrecompressedResponse
+from backend.prediction_cache import PredictionCache
+from backend.reloader import ArtifactWatcher
+from data_pipeline.compiled_forest import FOREST_FILENAME, FOREST_META_FILENAME, CompiledForest
+from data_pipeline.cube import CUBE_FILENAME, CUBE_META_FILENAME, QUERY_DIMENSIONS, DataCube
+from data_pipeline.features import (
+    CATEGORICAL_FEATURES, DAY_OF_WEEK_INDEX, DEFAULT_HOUR, DEFAULT_WEEKDAY,
+    TEMPORAL_FEATURES, TIME_OF_DAY_HOURS, FeatureEncoder
+)
+from data_pipeline.normalization import normalize_service_type
+from data_pipeline.prediction_table import INDEX_FILENAME, TABLE_FILENAME, PredictionTable
+from data_pipeline.rollups import (
+    DEFAULT_MAX_POINTS, ROLLUPS_FILENAME, ROLLUPS_META_FILENAME, SERIES_DIMENSIONS, TimeRollups
+)
+from data_pipeline.store import STORE_FILENAME, RecordStore
+
 app = Flask(__name__)
 CORS(app)
 
-# Global variables for cached data
+# Request and prediction-stage timings for /metrics; CITYPULSE_METRICS=0 turns them off.
+# Under gunicorn, CITYPULSE_METRICS_DIR holds each worker's snapshot for aggregation
+metrics = Metrics(
+    enabled=os.environ.get("CITYPULSE_METRICS", "1") != "0",
+    multiprocess_dir=os.environ.get("CITYPULSE_METRICS_DIR")
+)
+metrics.init_app(app)
+
+PROCESSED_DIR = Path("data/processed")
+INSIGHTS_PATH = PROCESSED_DIR / "insights.json"
+MODEL_PATH = PROCESSED_DIR / "model.joblib"
+
+# Files whose replacement by a pipeline run triggers a reload
+WATCHED_PATHS = [
+    INSIGHTS_PATH,
+    MODEL_PATH,
+    PROCESSED_DIR / FOREST_FILENAME,
+    PROCESSED_DIR / FOREST_META_FILENAME,
+    PROCESSED_DIR / TABLE_FILENAME,
+    PROCESSED_DIR / INDEX_FILENAME,
+    PROCESSED_DIR / CUBE_FILENAME,
+    PROCESSED_DIR / CUBE_META_FILENAME,
+    PROCESSED_DIR / ROLLUPS_FILENAME,
+    PROCESSED_DIR / ROLLUPS_META_FILENAME,
+    PROCESSED_DIR / STORE_FILENAME,
+]
+RELOAD_POLL_SECONDS = float(os.environ.get("CITYPULSE_RELOAD_POLL_SECONDS", 5))
+ADMIN_TOKEN = os.environ.get("CITYPULSE_ADMIN_TOKEN")
+
+# Global variables for cached data. They are only ever replaced as a set
+# by load_data, so a request that has read them keeps a consistent view.
 dashboard_data = None
+dashboard_response = None
 model_data = None
+prediction_table = None
+data_cube = None
+time_rollups = None
+record_store = None
+data_generation = 0
+model_lock = threading.Lock()
+reload_lock = threading.Lock()
+
+# Predictions keyed on the data generation and the categorical input tuple
+prediction_cache = PredictionCache(maxsize=10000, ttl_seconds=3600)
+
+def model_on_disk():
+    return CompiledForest.exists(PROCESSED_DIR) or MODEL_PATH.exists()
+
+def load_model():
+    """Load the model and build its feature encoder
+    
+    The compiled forest is preferred: it is memory-mapped, shared between
+    worker processes and scored with NumPy alone. Without it, the sklearn
+    model is unpickled from model.joblib.
+    """
+    if CompiledForest.exists(PROCESSED_DIR):
+        forest = CompiledForest.load(PROCESSED_DIR)
+        return {
+            'model': forest,
+            'feature_columns': forest.feature_columns,
+            'encoder': FeatureEncoder(forest.feature_columns)
+        }
+    
+    import joblib
+    model_data = joblib.load(MODEL_PATH)
+    model_data['encoder'] = FeatureEncoder(model_data['feature_columns'])
+    # The encoder fixes the column order, so the model is scored with
+    # plain arrays instead of a one-row DataFrame per request
+    if hasattr(model_data['model'], 'feature_names_in_'):
+        del model_data['model'].feature_names_in_
+    return model_data
+
+def build_dashboard_response(dashboard_data):
+    """Serialize and compress the /api/dashboard-data payload once per insights.json"""
+    last_updated = dashboard_data.get("generated_at", datetime.now().isoformat())
+    body = app.json.dumps({
+        "status": "success",
+        "data": dashboard_data,
+        "last_updated": last_updated
+    }).encode()
+    return PrecompressedResponse(body, version=last_updated)
+
+def load_artifacts(preload_model=False):
+    """Read every pipeline output into memory without touching the globals"""
+    if INSIGHTS_PATH.exists():
+        with open(INSIGHTS_PATH, 'r') as f:
+            new_dashboard_data = json.load(f)
+        new_dashboard_response = build_dashboard_response(new_dashboard_data)
+        print("Dashboard chart data loaded")
+    else:
+        print("insights.json not found - run data pipeline first")
+        new_dashboard_data = None
+        new_dashboard_response = None
+    
+    # Prefer the precomputed table; the sklearn model is then only
+    # loaded if a request falls outside it
+    new_prediction_table = None
+    new_model_data = None
+    if PredictionTable.exists(PROCESSED_DIR):
+        new_prediction_table = PredictionTable.load(PROCESSED_DIR)
+        print("Prediction table loaded")
+        if preload_model and model_on_disk():
+            new_model_data = load_model()
+    elif model_on_disk():
+        new_model_data = load_model()
+        print(f"ML model loaded ({type(new_model_data['model']).__name__})")
+    else:
+        print("model.joblib not found - run data pipeline first")
+    
+    new_data_cube = None
+    if DataCube.exists(PROCESSED_DIR):
+        new_data_cube = DataCube.load(PROCESSED_DIR)
+        print(f"Data cube loaded ({new_data_cube.cell_count} cells)")
+    
+    new_time_rollups = None
+    if TimeRollups.exists(PROCESSED_DIR):
+        new_time_rollups = TimeRollups.load(PROCESSED_DIR)
+        print(f"Time-series rollups loaded ({new_time_rollups.series_count} series)")
+    
+    # Queries open their own read-only connections; this only checks the file
+    new_record_store = None
+    if RecordStore.exists(PROCESSED_DIR):
+        new_record_store = RecordStore.open(PROCESSED_DIR)
+        print(f"Record store found at {new_record_store.path}")
+    
+    return (new_dashboard_data, new_dashboard_response, new_model_data, new_prediction_table,
+            new_data_cube, new_time_rollups, new_record_store)
 
 def load_data():
-    global dashboard_data, model_data
-    
-    try:
-        # Load dashboard data (charts)
-        insights_path = Path("data/processed/insights.json")
-        if insights_path.exists():
-            with open(insights_path, 'r') as f:
-                dashboard_data = json.load(f)
-            print("Dashboard chart data loaded")
-        else:
-            print("insights.json not found - run data pipeline first")
-            dashboard_data = None
+    """Load the pipeline outputs and swap them in as one set
+    
+    Everything is read and prepared before any global changes, so requests
+    keep being served from the previous version until the swap, and a
+    failed reload leaves that version in place. Returns True on success.
+    """
+    global dashboard_data, dashboard_response, model_data, prediction_table, data_cube, time_rollups, record_store
+    global data_generation
+    
+    with reload_lock:
+        try:
+            # Keep a model that was already needed warm across reloads
+            artifacts = load_artifacts(preload_model=model_data is not None)
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return False
         
-        
-        model_path = Path("data/processed/model.joblib")
-        if model_path.exists():
-            model_data = joblib.load(model_path)
-            print("ML model loaded")
-        else:
-            print("model.joblib not found - run data pipeline first")
-            model_data = None
-            
-    except Exception as e:
-        print(f"Error loading data: {e}")
-        dashboard_data = None
-        model_data = None
+        with model_lock:
+            (dashboard_data, dashboard_response, model_data, prediction_table,
+             data_cube, time_rollups, record_store) = artifacts
+            data_generation += 1
+        prediction_cache.clear()
+        return True
+
+def get_model_data():
+    """Return the sklearn model, loading it on first use behind the prediction table"""
+    global model_data
+    
+    generation = data_generation
+    current = model_data
+    if current is None and model_on_disk():
+        with model_lock:
+            if model_data is None and data_generation == generation:
+                model_data = load_model()
+                print("ML model loaded for inputs outside the prediction table")
+            current = model_data
+    return current
+
+def collect_metrics():
+    """Prediction cache and reload figures exported next to the request metrics"""
+    cache_stats = prediction_cache.stats()
+    counters = [
+        ("citypulse_prediction_cache_hits_total", "Prediction cache hits", cache_stats['hits']),
+        ("citypulse_prediction_cache_misses_total", "Prediction cache misses", cache_stats['misses']),
+        ("citypulse_prediction_cache_evictions_total", "Prediction cache evictions", cache_stats['evictions']),
+    ]
+    gauges = [
+        ("citypulse_prediction_cache_size", "Entries in the prediction cache", cache_stats['size']),
+        ("citypulse_data_generation", "Number of times the pipeline outputs have been loaded", data_generation),
+    ]
+    return counters, gauges
+
+metrics.collect = collect_metrics
+
+def start_artifact_watcher():
+    """Reload in the background whenever the pipeline replaces its outputs"""
+    watcher = ArtifactWatcher(WATCHED_PATHS, load_data, interval=RELOAD_POLL_SECONDS)
+    watcher.start()
+    return watcher
+
+def predictions_available():
+    return prediction_table is not None or model_data is not None
 
 @app.route('/api/dashboard-data', methods=['GET'])
 def get_dashboard_data():
-    if dashboard_data is None:
+    if dashboard_response is None:
         return jsonify({
             "status": "error",
             "message": "Dashboard data not available. Run data_pipeline.py first."
         }), 500
     
-    return jsonify({
-        "status": "success",
-        "data": dashboard_data,
-        "last_updated": dashboard_data.get("generated_at", datetime.now().isoformat())
-    })
+    return dashboard_response.respond(request)
 
 @app.route('/api/predict-completion', methods=['POST'])
 def predict_completion():
-    if model_data is None:
+    if not predictions_available():
         return jsonify({
             "status": "error",
             "message": "ML model not available. Run data_pipeline.py first."
@@ -76,22 +257,23 @@ def predict_completion():
             }), 400
         
       
-        required_fields = ['service_type', 'ward', 'division']
-        missing_fields = [field for field in required_fields if not data.get(field)]
+        with metrics.stage("validate"):
+            error = validate_record(data)
         
-        if missing_fields:
+        if error:
             return jsonify({
                 "status": "error",
-                "message": f"Missing required fields: {', '.join(missing_fields)}"
+                "message": error
             }), 400
         
        
         prediction_result = make_prediction(data)
         
-        return jsonify({
-            "status": "success",
-            "prediction": prediction_result
-        })
+        with metrics.stage("serialize"):
+            return jsonify({
+                "status": "success",
+                "prediction": prediction_result
+            })
         
     except Exception as e:
         print(f"Prediction error: {str(e)}")
@@ -101,54 +283,208 @@ def predict_completion():
             "message": f"Prediction failed: {str(e)}"
         }), 500
 
-def make_prediction(input_data):
-    model = model_data['model']
-    feature_columns = model_data['feature_columns']
-    categorical_values = model_data['categorical_values']
-    
-    
-    features = pd.DataFrame(0, index=[0], columns=feature_columns)
-    
-   
-    service_type = input_data.get('service_type', '')
-    ward = input_data.get('ward', '')
-    division = input_data.get('division', '')
-    
-   
-    for col in feature_columns:
-        if col.startswith('Service Request Type_') and service_type in col:
-            features.loc[0, col] = 1
-        elif col.startswith('Ward_') and ward in col:
-            features.loc[0, col] = 1
-        elif col.startswith('Division_') and division in col:
-            features.loc[0, col] = 1
-    
-   
-    time_mapping = {
-        'morning': 9, 'afternoon': 14, 'evening': 19, 'night': 2
-    }
-    day_mapping = {
-        'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-        'friday': 4, 'saturday': 5, 'sunday': 6
-    }
-    
-    
-    if 'Month' in feature_columns:
-        features.loc[0, 'Month'] = datetime.now().month
-    
-    if 'Weekday' in feature_columns:
-        day_of_week = input_data.get('day_of_week', '').lower()
-        features.loc[0, 'Weekday'] = day_mapping.get(day_of_week, 1)
-    
-    if 'Hour' in feature_columns:
-        time_of_day = input_data.get('time_of_day', '').lower()
-        features.loc[0, 'Hour'] = time_mapping.get(time_of_day, 12)
-    
-    
-    prediction_proba = model.predict_proba(features)[0]
-    prediction = model.predict(features)[0]
-    
+def parse_batch_body():
+    """Read batch records from a JSON array, {"records": [...]}, or NDJSON body.
+
+    Returns a list where unparseable NDJSON lines are kept as ValueError
+    instances so they can be reported per record instead of failing the batch.
+    """
+    mimetype = request.mimetype or ''
+
+    if mimetype in ('application/x-ndjson', 'application/jsonl', 'application/ndjson'):
+        records = []
+        for line_number, line in enumerate(request.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                records.append(ValueError(f"Invalid JSON on line {line_number}: {e.msg}"))
+        return records
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('records')
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of records, {\"records\": [...]}, or an NDJSON body")
+
+    return data
+
+@app.route('/api/predict-completion/batch', methods=['POST'])
+def predict_completion_batch():
+    if not predictions_available():
+        return jsonify({
+            "status": "error",
+            "message": "ML model not available. Run data_pipeline.py first."
+        }), 500
     
+    try:
+        try:
+            records = parse_batch_body()
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
+        
+        if not records:
+            return jsonify({
+                "status": "error",
+                "message": "No data provided"
+            }), 400
+        
+        if len(records) > MAX_BATCH_SIZE:
+            return jsonify({
+                "status": "error",
+                "message": f"Batch too large: {len(records)} records (max {MAX_BATCH_SIZE})"
+            }), 413
+        
+        results = [None] * len(records)
+        valid_indices = []
+        with metrics.stage("validate"):
+            for i, record in enumerate(records):
+                error = str(record) if isinstance(record, ValueError) else validate_record(record)
+                if error:
+                    results[i] = {"index": i, "status": "error", "message": error}
+                else:
+                    valid_indices.append(i)
+        
+        if valid_indices:
+            predictions = make_predictions([records[i] for i in valid_indices])
+            for i, prediction in zip(valid_indices, predictions):
+                if prediction is None:
+                    results[i] = {"index": i, "status": "error", "message": "No prediction available for this combination"}
+                else:
+                    results[i] = {"index": i, "status": "success", "prediction": prediction}
+        
+        succeeded = sum(1 for result in results if result["status"] == "success")
+        with metrics.stage("serialize"):
+            return jsonify({
+                "status": "success",
+                "total": len(records),
+                "succeeded": succeeded,
+                "failed": len(records) - succeeded,
+                "results": results
+            })
+        
+    except Exception as e:
+        print(f"Batch prediction error: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({
+            "status": "error",
+            "message": f"Batch prediction failed: {str(e)}"
+        }), 500
+
+REQUIRED_FIELDS = ['service_type', 'ward', 'division']
+OPTIONAL_FIELDS = ['day_of_week', 'time_of_day']
+
+# Upper bound on records accepted by the batch endpoint in one request
+MAX_BATCH_SIZE = 50000
+
+
+def validate_record(record):
+    """Return an error message for an invalid prediction record, or None"""
+    if not isinstance(record, dict):
+        return "Record must be a JSON object"
+
+    missing_fields = [field for field in REQUIRED_FIELDS if not record.get(field)]
+    if missing_fields:
+        return f"Missing required fields: {', '.join(missing_fields)}"
+
+    invalid_fields = [
+        field for field in REQUIRED_FIELDS + OPTIONAL_FIELDS
+        if record.get(field) is not None and not isinstance(record[field], str)
+    ]
+    if invalid_fields:
+        return f"Fields must be strings: {', '.join(invalid_fields)}"
+
+    return None
+
+
+def to_model_record(input_data):
+    """Map API input fields onto the model's feature fields"""
+    return {
+        # Normalized like the training data, so alias names score as their canonical type
+        'Service Request Type': normalize_service_type(input_data.get('service_type', '')),
+        'Ward': input_data.get('ward', ''),
+        'Division': input_data.get('division', ''),
+        'Month': datetime.now().month,
+        'Weekday': DAY_OF_WEEK_INDEX.get((input_data.get('day_of_week') or '').lower(), DEFAULT_WEEKDAY),
+        'Hour': TIME_OF_DAY_HOURS.get((input_data.get('time_of_day') or '').lower(), DEFAULT_HOUR)
+    }
+
+
+def prediction_key(model_record):
+    return tuple(model_record[field] for field in CATEGORICAL_FEATURES + TEMPORAL_FEATURES)
+
+
+def predict_probabilities(model_records):
+    """Class probabilities per record, or None where no prediction is available.
+
+    Records are answered from the precomputed table first, then from the
+    prediction cache; whatever is left is encoded and scored by the model
+    in one predict_proba call.
+    """
+    probabilities = [None] * len(model_records)
+    table = prediction_table
+    generation = data_generation
+    
+    if table is not None:
+        with metrics.stage("table_lookup"):
+            for i, completion in enumerate(table.lookup_many(model_records)):
+                if not np.isnan(completion):
+                    probabilities[i] = (1 - float(completion), float(completion))
+    
+    keys = {}
+    with metrics.stage("cache_lookup"):
+        for i, model_record in enumerate(model_records):
+            if probabilities[i] is None:
+                keys[i] = (generation,) + prediction_key(model_record)
+                probabilities[i] = prediction_cache.get(keys[i])
+    
+    misses = {}
+    for i, key in keys.items():
+        if probabilities[i] is None:
+            misses.setdefault(key, i)
+    
+    current_model = get_model_data() if misses else None
+    if current_model is not None:
+        with metrics.stage("encode"):
+            features = current_model['encoder'].encode_many([model_records[i] for i in misses.values()])
+        with metrics.stage("predict_proba"):
+            model_probabilities = current_model['model'].predict_proba(features)
+        for key, proba in zip(misses, model_probabilities):
+            proba = tuple(float(p) for p in proba)
+            prediction_cache.put(key, proba)
+            misses[key] = proba
+        for i, key in keys.items():
+            if probabilities[i] is None:
+                probabilities[i] = misses[key]
+    
+    return probabilities
+
+
+def make_predictions(records):
+    """Score a list of validated records; None marks records that could not be scored"""
+    with metrics.stage("build_features"):
+        model_records = [to_model_record(record) for record in records]
+    probabilities = predict_probabilities(model_records)
+    
+    with metrics.stage("format"):
+        return [
+            None if prediction_proba is None else format_prediction(record, prediction_proba)
+            for record, prediction_proba in zip(records, probabilities)
+        ]
+
+
+def make_prediction(input_data):
+    prediction = make_predictions([input_data])[0]
+    if prediction is None:
+        raise ValueError("No prediction available for this combination")
+    return prediction
+
+
+def format_prediction(input_data, prediction_proba):
     completion_probability = prediction_proba[1] * 100  
     confidence = max(prediction_proba) * 100
     
@@ -216,6 +552,206 @@ def get_categorical_values():
         "data": categorical_values
     })
 
+# Groups returned by /api/query unless the request sets a limit
+DEFAULT_QUERY_LIMIT = 1000
+
+
+def parse_query():
+    """Read a cube query from the query string (GET) or a JSON body (POST).
+    
+    GET takes one parameter per filtered dimension, repeated for several
+    values (?ward=A&ward=B), and a comma-separated group_by. POST takes
+    {"filters": {...}, "group_by": [...], ...}.
+    """
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise ValueError("Expected a JSON object")
+        filters = body.get('filters') or {}
+        if not isinstance(filters, dict):
+            raise ValueError("filters must be an object")
+        filters = {name: values if isinstance(values, list) else [values] for name, values in filters.items()}
+        group_by = body.get('group_by') or []
+        if isinstance(group_by, str):
+            group_by = group_by.split(',')
+        if not isinstance(group_by, list) or not all(isinstance(name, str) for name in group_by):
+            raise ValueError("group_by must be a string or a list of strings")
+        options = body
+    else:
+        filters = {name: request.args.getlist(name) for name in QUERY_DIMENSIONS if name in request.args}
+        group_by = [name for value in request.args.getlist('group_by') for name in value.split(',') if name]
+        options = request.args
+    
+    try:
+        limit = int(options.get('limit', DEFAULT_QUERY_LIMIT))
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    for name in ('start', 'end', 'sort'):
+        if options.get(name) is not None and not isinstance(options.get(name), str):
+            raise ValueError(f"{name} must be a string")
+    
+    return {
+        "filters": filters,
+        "group_by": [name.strip() for name in group_by],
+        "start": options.get('start'),
+        "end": options.get('end'),
+        "sort": options.get('sort'),
+        "limit": limit
+    }
+
+@app.route('/api/query', methods=['GET', 'POST'])
+def query_cube():
+    """Request counts and completion rates for any filter and group-by"""
+    cube = data_cube
+    if cube is None:
+        return jsonify({
+            "status": "error",
+            "message": "Data cube not available. Run data_pipeline.py first."
+        }), 500
+    
+    try:
+        query = parse_query()
+        start = time.perf_counter()
+        with metrics.stage("cube_query"):
+            result = cube.query(**query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    
+    return jsonify({
+        "status": "success",
+        "query": query,
+        **result,
+        "elapsed_ms": round(elapsed_ms, 3)
+    })
+
+@app.route('/api/timeseries', methods=['GET'])
+def get_timeseries():
+    """Request counts over a date range, for all requests or one ward, division or service type.
+    
+    resolution is hour, day, week, month or auto (default), which picks the
+    finest resolution giving at most max_points buckets.
+    """
+    rollups = time_rollups
+    if rollups is None:
+        return jsonify({
+            "status": "error",
+            "message": "Time-series rollups not available. Run data_pipeline.py first."
+        }), 500
+    
+    try:
+        try:
+            max_points = int(request.args.get('max_points', DEFAULT_MAX_POINTS))
+        except ValueError:
+            raise ValueError("max_points must be an integer")
+        if max_points < 1:
+            raise ValueError("max_points must be positive")
+        with metrics.stage("timeseries"):
+            result = rollups.series(
+                start=request.args.get('start'),
+                end=request.args.get('end'),
+                resolution=request.args.get('resolution', 'auto'),
+                max_points=max_points,
+                **{name: request.args[name] for name in SERIES_DIMENSIONS if name in request.args}
+            )
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    
+    return jsonify({
+        "status": "success",
+        **result
+    })
+
+@app.route('/api/store/query', methods=['GET', 'POST'])
+def query_store():
+    """/api/query answered in SQL from the record store.
+    
+    Takes the same parameters, but start and end may carry a time of day
+    (2025-03-01T08:00), which the daily cube cannot answer.
+    """
+    store = record_store
+    if store is None:
+        return jsonify({
+            "status": "error",
+            "message": "Record store not available. Run data_pipeline.py --store first."
+        }), 500
+    
+    try:
+        query = parse_query()
+        start = time.perf_counter()
+        with metrics.stage("store_query"):
+            result = store.query(**query)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    except sqlite3.Error as e:
+        return jsonify({
+            "status": "error",
+            "message": f"Record store query failed: {e}"
+        }), 500
+    
+    return jsonify({
+        "status": "success",
+        "query": query,
+        **result,
+        "elapsed_ms": round(elapsed_ms, 3)
+    })
+
+@app.route('/api/admin/reload', methods=['POST'])
+def reload_data():
+    """Reload pipeline outputs now instead of waiting for the file watcher
+    
+    Disabled unless CITYPULSE_ADMIN_TOKEN is set: CORS allows every origin,
+    so an open endpoint would let any page trigger reloads.
+    """
+    if not ADMIN_TOKEN:
+        return jsonify({
+            "status": "error",
+            "message": "Reload endpoint disabled - set CITYPULSE_ADMIN_TOKEN to enable it"
+        }), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN):
+        return jsonify({
+            "status": "error",
+            "message": "Invalid admin token"
+        }), 403
+    
+    if not load_data():
+        return jsonify({
+            "status": "error",
+            "message": "Reload failed - still serving the previous data",
+            "generation": data_generation
+        }), 500
+    
+    return jsonify({
+        "status": "success",
+        "generation": data_generation,
+        "chart_data_available": dashboard_data is not None,
+        "ml_model_available": predictions_available()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of the metrics, summed over gunicorn workers"""
+    if not metrics.enabled:
+        return jsonify({
+            "status": "error",
+            "message": "Metrics are disabled (CITYPULSE_METRICS=0)"
+        }), 404
+    
+    body = metrics.render()
+    return app.response_class(body, mimetype="text/plain; version=0.0.4")
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     
@@ -223,7 +759,14 @@ def health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "chart_data_available": dashboard_data is not None,
-        "ml_model_available": model_data is not None,
+        "ml_model_available": predictions_available(),
+        "prediction_table_available": prediction_table is not None,
+        "data_cube_available": data_cube is not None,
+        "time_rollups_available": time_rollups is not None,
+        "record_store_available": record_store is not None,
+        "data_generation": data_generation,
+        "prediction_cache": prediction_cache.stats(),
+        "metrics": metrics.summary(),
         "message": "Backend ready for dynamic charts and ML predictions"
     })
 
@@ -236,26 +779,46 @@ def root():
         "endpoints": {
             "charts": "/api/dashboard-data",
             "prediction": "/api/predict-completion (POST)",
+            "batch_prediction": "/api/predict-completion/batch (POST, JSON array or NDJSON)",
             "dropdowns": "/api/categorical-values",
-            "health": "/api/health"
+            "query": "/api/query (GET or POST: filters, group_by, start, end)",
+            "timeseries": "/api/timeseries (GET: start, end, resolution, ward | division | service_type)",
+            "store_query": "/api/store/query (GET or POST, as /api/query with start/end times)",
+            "reload": "/api/admin/reload (POST)",
+            "health": "/api/health",
+            "metrics": "/metrics"
         },
         "note": "KPI cards are hardcoded in frontend - this API serves dynamic charts and ML predictions"
     })
 
+def create_app(watch=True):
+    """Load the pipeline outputs and return the app, ready to serve
+    
+    Called once by the WSGI entry point. Under gunicorn with preload_app
+    this runs in the master, so workers fork with the data already loaded
+    and share its pages copy-on-write. Threads do not survive a fork, so
+    the gunicorn config starts the watcher in each worker instead.
+    """
+    load_data()
+    if watch:
+        start_artifact_watcher()
+    return app
+
 if __name__ == '__main__':
     print(" Starting Toronto 311 Dashboard API...")
     print(" Focus: Dynamic charts and ML predictions")
     print(" Note: KPI cards remain hardcoded in frontend")
     
     
-    load_data()
+    create_app()
     
     print(f"\n Chart data available: {dashboard_data is not None}")
-    print(f" ML model available: {model_data is not None}")
+    print(f" ML model available: {predictions_available()}")
     
-    if dashboard_data is None or model_data is None:
+    if dashboard_data is None or not predictions_available():
         print("\n  Run 'python data_pipeline/data_pipeline.py' first!")
     
     print("\n API running on http://localhost:5000")
+    print(" Development server only - see README for serving with gunicorn")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,60 @@
+"""Gunicorn settings for serving the API in production
+
+Run from the repository root so data/processed resolves:
+
+    gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+
+The app is loaded once in the master (preload_app) and the workers are
+forked from it, so insights.json, the prepared dashboard responses and the
+memory-mapped prediction table and forest are shared between them rather
+than loaded once per worker.
+
+Each worker writes its metrics to CITYPULSE_METRICS_DIR (a fresh temporary
+directory by default), and /metrics sums them over all workers.
+"""
+import gc
+import multiprocessing
+import os
+from pathlib import Path
+import tempfile
+
+bind = os.environ.get("CITYPULSE_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("CITYPULSE_WORKERS", multiprocessing.cpu_count()))
+# Predictions release the GIL inside NumPy, so a few threads per worker
+# keep a worker busy while another request is waiting on the network
+worker_class = "gthread"
+threads = int(os.environ.get("CITYPULSE_THREADS", 4))
+preload_app = True
+timeout = 60
+keepalive = 5
+accesslog = os.environ.get("CITYPULSE_ACCESS_LOG")
+
+# Set before the app is preloaded, so the master and the workers inherit it
+metrics_dir = os.environ.get("CITYPULSE_METRICS_DIR") or tempfile.mkdtemp(prefix="citypulse-metrics-")
+os.environ["CITYPULSE_METRICS_DIR"] = metrics_dir
+
+
+def on_starting(server):
+    # Snapshots from a previous server would count towards the new totals
+    Path(metrics_dir).mkdir(parents=True, exist_ok=True)
+    for path in Path(metrics_dir).glob("*.json"):
+        path.unlink()
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's reach, so its
+    # reference count updates in the workers do not copy the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from backend.app import metrics, start_artifact_watcher
+
+    start_artifact_watcher()
+    metrics.start_writer()
+
+
+def child_exit(server, worker):
+    from backend.metrics import Metrics
+
+    Metrics.mark_process_dead(metrics_dir, worker.pid)
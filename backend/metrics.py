@@ -0,0 +1,315 @@
+"""Request and stage metrics in Prometheus text format.
+
+Metrics are recorded in process. Under gunicorn each worker also writes a
+snapshot to a shared directory every FLUSH_SECONDS, and /metrics in any
+worker sums the snapshots of all workers, so scrapes do not jump between
+workers' numbers (like prometheus_client's multiprocess mode).
+"""
+from bisect import bisect_left
+from contextlib import nullcontext
+import json
+import os
+from pathlib import Path
+import threading
+import time
+
+from data_pipeline.atomic import atomic_write
+
+# How often each worker writes its snapshot for the others to aggregate
+FLUSH_SECONDS = 1.0
+
+# Upper bounds in seconds, from cache hits up to cold model loads
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def format_labels(labelnames, labels, **extra):
+    pairs = list(zip(labelnames, labels)) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def values(self):
+        with self._lock:
+            return dict(self._values)
+
+    def empty(self):
+        return Counter(self.name, self.help, self.labelnames)
+
+    def dump(self):
+        return [[list(labels), value] for labels, value in self.values().items()]
+
+    def merge(self, dumped):
+        for labels, value in dumped:
+            self.inc(tuple(labels), value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram; one series per label tuple"""
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket counts plus an overflow slot, then the sum
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+
+    def empty(self):
+        return Histogram(self.name, self.help, self.labelnames, self.buckets)
+
+    def dump(self):
+        return [[list(labels), counts, total] for labels, (counts, total) in self.snapshot().items()]
+
+    def merge(self, dumped):
+        with self._lock:
+            for labels, counts, total in dumped:
+                series = self._series.setdefault(tuple(labels), [[0] * (len(self.buckets) + 1), 0.0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+
+    def quantile(self, counts, q):
+        """Upper bound of the bucket holding quantile q, or None past the last bucket"""
+        target = q * sum(counts)
+        seen = 0
+        for bound, count in zip(self.buckets, counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(self.labelnames, labels, le=bound)} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{format_labels(self.labelnames, labels, le='+Inf')} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class StageTimer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(self.labels, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Request latency, request and error counts, and hot-path stage timings.
+
+    When disabled, no request hooks are installed and ``stage`` returns a
+    shared no-op context manager, so instrumented code costs one attribute
+    check per stage.
+
+    collect, if set, returns the application's own (name, help, value)
+    counters and gauges. With multiprocess_dir, render aggregates every
+    worker's snapshot in that directory: counters and histograms are
+    summed, and gauges get a worker label with the worker's pid.
+    """
+
+    def __init__(self, enabled=True, multiprocess_dir=None):
+        self.enabled = enabled
+        self.multiprocess_dir = Path(multiprocess_dir) if multiprocess_dir else None
+        self.collect = None
+        self._write_lock = threading.Lock()
+        self.request_latency = Histogram(
+            "citypulse_request_duration_seconds", "Request latency by route", ("route", "method"))
+        self.requests = Counter(
+            "citypulse_requests_total", "Requests by route and status code", ("route", "method", "status"))
+        self.errors = Counter(
+            "citypulse_request_errors_total", "Requests that ended in a 5xx response or exception", ("route", "method"))
+        self.stage_latency = Histogram(
+            "citypulse_stage_duration_seconds", "Time spent in each prediction stage", ("stage",))
+        self._noop = nullcontext()
+
+    def stage(self, name):
+        if not self.enabled:
+            return self._noop
+        return StageTimer(self.stage_latency, (name,))
+
+    def init_app(self, app):
+        if not self.enabled:
+            return
+
+        from flask import g, request
+
+        @app.before_request
+        def start_timer():
+            g.metrics_start = time.perf_counter()
+
+        @app.after_request
+        def record_request(response):
+            start = g.pop('metrics_start', None)
+            if start is not None:
+                labels = (request.url_rule.rule if request.url_rule else "unmatched", request.method)
+                self.request_latency.observe(labels, time.perf_counter() - start)
+                self.requests.inc(labels + (str(response.status_code),))
+                if response.status_code >= 500:
+                    self.errors.inc(labels)
+            return response
+
+        @app.teardown_request
+        def record_exception(exc):
+            # after_request is skipped when a view raises
+            if exc is not None and g.pop('metrics_start', None) is not None:
+                labels = (request.url_rule.rule if request.url_rule else "unmatched", request.method)
+                self.requests.inc(labels + ("500",))
+                self.errors.inc(labels)
+
+    def _metrics(self):
+        return (self.request_latency, self.requests, self.errors, self.stage_latency)
+
+    def dump(self):
+        """This process's metrics as a JSON-serializable snapshot"""
+        counters, gauges = self.collect() if self.collect is not None else ((), ())
+        return {
+            "pid": os.getpid(),
+            "metrics": {metric.name: metric.dump() for metric in self._metrics()},
+            "counters": [list(counter) for counter in counters],
+            "gauges": [list(gauge) for gauge in gauges],
+        }
+
+    def write(self):
+        """Write this process's snapshot to multiprocess_dir"""
+        snapshot = self.dump()
+        with self._write_lock, atomic_write(self.multiprocess_dir / f"{os.getpid()}.json") as f:
+            json.dump(snapshot, f)
+
+    def start_writer(self, interval=FLUSH_SECONDS):
+        """Write snapshots in a daemon thread; call once per worker, after the fork"""
+        if not self.enabled or self.multiprocess_dir is None:
+            return None
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write()
+                except OSError as e:
+                    print(f"Could not write metrics snapshot: {e}")
+
+        thread = threading.Thread(target=run, name="metrics-writer", daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def mark_process_dead(directory, pid):
+        """Drop an exited worker's gauges; its counters still count towards the totals"""
+        path = Path(directory) / f"{pid}.json"
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        snapshot["gauges"] = []
+        with atomic_write(path) as f:
+            json.dump(snapshot, f)
+
+    def snapshots(self):
+        """Snapshots to aggregate: every worker's, or just this process's"""
+        if self.multiprocess_dir is None:
+            return [self.dump()]
+        self.write()
+        snapshots = []
+        for path in sorted(self.multiprocess_dir.glob("*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def render(self):
+        """Prometheus text exposition of the aggregated metrics"""
+        snapshots = self.snapshots()
+        lines = []
+        for metric in self._metrics():
+            merged = metric.empty()
+            for snapshot in snapshots:
+                merged.merge(snapshot["metrics"].get(metric.name, []))
+            lines.extend(merged.render())
+
+        counters = {}
+        for snapshot in snapshots:
+            for name, help, value in snapshot["counters"]:
+                counters[name] = (help, counters.get(name, (help, 0))[1] + value)
+        for name, (help, value) in counters.items():
+            lines.extend([f"# HELP {name} {help}", f"# TYPE {name} counter", f"{name} {value}"])
+
+        gauges = {}
+        for snapshot in snapshots:
+            for name, help, value in snapshot["gauges"]:
+                labels = format_labels(("worker",), (snapshot["pid"],)) if self.multiprocess_dir else ""
+                gauges.setdefault(name, (help, []))[1].append(f"{name}{labels} {value}")
+        for name, (help, samples) in gauges.items():
+            lines.extend([f"# HELP {name} {help}", f"# TYPE {name} gauge", *samples])
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Per-route counts and latency for /api/health"""
+        if not self.enabled:
+            return {"enabled": False}
+
+        errors = self.errors.values()
+        routes = {}
+        for (route, method), (counts, total) in sorted(self.request_latency.snapshot().items()):
+            count = sum(counts)
+            p99 = self.request_latency.quantile(counts, 0.99)
+            routes[f"{method} {route}"] = {
+                "count": count,
+                "errors": errors.get((route, method), 0),
+                "mean_ms": round(total / count * 1000, 3),
+                "p99_ms": None if p99 is None else round(p99 * 1000, 3),
+            }
+        stages = {
+            stage: round(total / sum(counts) * 1000, 4)
+            for (stage,), (counts, total) in sorted(self.stage_latency.snapshot().items())
+        }
+        return {"enabled": True, "routes": routes, "stage_mean_ms": stages}
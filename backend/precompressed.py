@@ -0,0 +1,57 @@
+"""Pre-serialized, pre-compressed JSON responses with strong ETags"""
+import gzip
+import hashlib
+
+from flask import Response
+from werkzeug.http import parse_etags
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+
+class PrecompressedResponse:
+    """A JSON body serialized and compressed once, served many times.
+
+    Each available encoding (br, gzip, identity) gets its own strong ETag,
+    derived from a version string such as the pipeline's generated_at, so
+    conditional requests are answered with 304 and no body.
+    """
+
+    def __init__(self, body, version):
+        base = hashlib.sha256(version.encode()).hexdigest()[:20]
+        self.bodies = {'identity': body}
+        self.etags = {'identity': f'"{base}"'}
+
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(body, quality=11)
+            self.etags['br'] = f'"{base}-br"'
+
+        self.bodies['gzip'] = gzip.compress(body, compresslevel=9)
+        self.etags['gzip'] = f'"{base}-gzip"'
+
+    def negotiate(self, accept_encodings):
+        """Pick the smallest encoding the client accepts"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.bodies and accept_encodings[encoding] > 0:
+                return encoding
+        return 'identity'
+
+    def respond(self, request):
+        encoding = self.negotiate(request.accept_encodings)
+        headers = {
+            'ETag': self.etags[encoding],
+            'Vary': 'Accept-Encoding',
+            'Cache-Control': 'no-cache'
+        }
+
+        if_none_match = parse_etags(request.headers.get('If-None-Match'))
+        # Only the negotiated encoding's ETag validates: a client holding the
+        # gzip body must not get a 304 for a br or identity request
+        if if_none_match.star_tag or self.etags[encoding].strip('"') in if_none_match:
+            return Response(status=304, headers=headers)
+
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(self.bodies[encoding], mimetype='application/json', headers=headers)
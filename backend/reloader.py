@@ -0,0 +1,53 @@
+"""Background watcher that reloads pipeline outputs when they change on disk"""
+import os
+import threading
+
+
+def file_signature(paths):
+    """(mtime_ns, size) per path, None for files that do not exist"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class ArtifactWatcher(threading.Thread):
+    """Poll a set of files and call ``reload`` once they have changed.
+
+    A change is only acted on after the signature has stayed the same for
+    one more poll, so a pipeline run that replaces several files in a row
+    triggers a single reload of the finished set rather than one per file.
+    """
+
+    def __init__(self, paths, reload, interval=5.0):
+        super().__init__(name="artifact-watcher", daemon=True)
+        self.paths = list(paths)
+        self.reload = reload
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        loaded = file_signature(self.paths)
+        pending = None
+
+        while not self._stop_event.wait(self.interval):
+            current = file_signature(self.paths)
+            if current == loaded:
+                pending = None
+            elif current != pending:
+                pending = current
+            else:
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"Reload failed: {e}")
+                loaded = current
+                pending = None
+
+    def stop(self):
+        self._stop_event.set()
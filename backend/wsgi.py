@@ -0,0 +1,12 @@
+"""WSGI entry point: gunicorn -c backend/gunicorn.conf.py backend.wsgi:app"""
+from pathlib import Path
+import sys
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from backend.app import create_app
+
+# The file watcher is started per worker by the gunicorn post_fork hook
+app = create_app(watch=False)
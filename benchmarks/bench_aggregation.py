@@ -0,0 +1,75 @@
+"""Benchmark the single-pass chart aggregation against per-chart groupbys.
+
+Builds a synthetic cleaned frame (benchmarks/synthetic_data.py) covering
+six years with the dashboard's columns, and times:
+  - per_chart: the original generate_chart_data approach (a groupby on the
+    Date column, four value_counts and a groupby on Hour)
+  - count_groups: data_pipeline.aggregation.count_groups over CHART_DIMENSIONS
+
+both on object (string) columns, as produced by read_csv, and on
+categorical columns, as produced by the streaming loader and the cache.
+
+Usage: python benchmarks/bench_aggregation.py [--rows 5000000] [--repeat 3]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic_data import cleaned_frame
+from data_pipeline.aggregates import CHART_DIMENSIONS
+from data_pipeline.aggregation import count_groups
+
+
+def per_chart(df):
+    """The six passes the pipeline used to make"""
+    dates = df["Creation Date"].dt.date
+    daily_counts = df.groupby(dates).size()
+    ward_counts = df["Ward"].value_counts().head(15)
+    status_counts = df["Status"].value_counts()
+    service_counts = df["Service Request Type"].value_counts().head(15)
+    division_counts = df["Division"].value_counts().head(10)
+    hourly_counts = df.groupby("Hour").size()
+    return daily_counts, ward_counts, status_counts, service_counts, division_counts, hourly_counts
+
+
+def single_pass(df):
+    return count_groups(df, CHART_DIMENSIONS)
+
+
+def best_time(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Building synthetic frame with {args.rows} rows...")
+    df = cleaned_frame(args.rows, days=6 * 365)
+    frames = {
+        "object": df,
+        "categorical": df.astype({col: "category" for col in ["Status", "Service Request Type", "Division", "Ward"]})
+    }
+
+    for label, frame in frames.items():
+        baseline = best_time(per_chart, frame, args.repeat)
+        engine = best_time(single_pass, frame, args.repeat)
+        print(f"{label:>12}: per_chart {baseline:.3f}s  count_groups {engine:.3f}s  speedup {baseline / engine:.1f}x")
+
+    counts = single_pass(frames["categorical"])
+    expected = frames["object"]["Ward"].value_counts()
+    assert counts["ward"].sort_index().equals(expected.sort_index().rename("ward").rename_axis(None)), "ward counts differ"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark time-feature extraction from Creation Date strings.
+
+Compares, on the same synthetic timestamps:
+  - slice_per_row: the old Requests_per_hour.py loop, slicing [11:13] per row
+  - strptime_per_row: the old weekDaysData.py loop, datetime.strptime per row
+  - to_datetime_x3: the old start.py, pd.to_datetime three times plus .dt
+  - parse_once_dt: one pd.to_datetime, then .dt.month/.dayofweek/.hour
+  - parse_once_time_features: one parse, then data_pipeline.time_features
+
+The per-row loops are timed on --loop-rows rows and scaled up to --rows,
+since running them on millions of rows takes minutes.
+
+Usage: python benchmarks/bench_time_features.py [--rows 5000000] [--output results.json]
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.synthetic_data import creation_date_strings
+from data_pipeline.time_features import parse_creation_dates, time_features
+
+
+def slice_per_row(values):
+    hours = {f"{hour:02d}:00": 0 for hour in range(24)}
+    for value in values:
+        hours[f"{value[11:13]}:00"] += 1
+    return hours
+
+
+def strptime_per_row(values):
+    week_days = {}
+    for value in values:
+        day = datetime.strptime(value.strip()[0:10].strip(), "%Y-%m-%d").strftime("%A")
+        week_days[day] = week_days.get(day, 0) + 1
+    return week_days
+
+
+def to_datetime_x3(values):
+    return (pd.to_datetime(values, errors='coerce').dt.month,
+            pd.to_datetime(values, errors='coerce').dt.dayofweek,
+            pd.to_datetime(values, errors='coerce').dt.hour)
+
+
+def parse_once_dt(values):
+    parsed = parse_creation_dates(values)
+    return (parsed.dt.month.astype('int8'), parsed.dt.dayofweek.astype('int8'), parsed.dt.hour.astype('int8'))
+
+
+def parse_once_time_features(values):
+    return time_features(parse_creation_dates(values))
+
+
+def best_of(func, values, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(values)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--loop-rows", type=int, default=200_000, help="rows the per-row loops are timed on")
+    parser.add_argument("--repeat", type=int, default=3, help="best of this many runs per method")
+    parser.add_argument("--output", help="write the timings to this JSON file")
+    args = parser.parse_args()
+
+    values = creation_date_strings(args.rows)
+    loop_values = values.iloc[:args.loop_rows].tolist()
+
+    # The vectorized paths must agree with .dt before their timings mean anything
+    features = parse_once_time_features(values.iloc[:100_000])
+    month, weekday, hour = parse_once_dt(values.iloc[:100_000])
+    assert (features['Month'] == month.to_numpy()).all()
+    assert (features['Weekday'] == weekday.to_numpy()).all()
+    assert (features['Hour'] == hour.to_numpy()).all()
+
+    scale = args.rows / len(loop_values)
+    results = {
+        "rows": args.rows,
+        "seconds": {
+            "slice_per_row": round(best_of(slice_per_row, loop_values, 1) * scale, 3),
+            "strptime_per_row": round(best_of(strptime_per_row, loop_values, 1) * scale, 3),
+            "to_datetime_x3": round(best_of(to_datetime_x3, values, args.repeat), 3),
+            "parse_once_dt": round(best_of(parse_once_dt, values, args.repeat), 3),
+            "parse_once_time_features": round(best_of(parse_once_time_features, values, args.repeat), 3),
+        },
+    }
+    parsed = parse_creation_dates(values)
+    results["extract_only_seconds"] = {
+        "dt_accessors": round(best_of(lambda v: (v.dt.month, v.dt.dayofweek, v.dt.hour), parsed, args.repeat), 3),
+        "time_features": round(best_of(time_features, parsed, args.repeat), 3),
+    }
+
+    fastest = results["seconds"]["parse_once_time_features"]
+    print(f"{args.rows} timestamps (per-row loops scaled from {len(loop_values)} rows):")
+    for name, seconds in {**results["seconds"], **{f"extract: {k}": v for k, v in results["extract_only_seconds"].items()}}.items():
+        print(f"   {name:<32}{seconds:>10.3f}s{seconds / fastest:>9.1f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Load-test the running API at several concurrency levels.
+
+For each endpoint and concurrency level, runs that many client threads for a
+fixed duration, each sending requests back to back over one keep-alive
+connection, and reports throughput and p50/p99 latency:
+  - dashboard: GET /api/dashboard-data (gzip accepted, as browsers send it)
+  - predict:   POST /api/predict-completion, cycling through a set of records
+
+Start the server first, e.g. gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+
+Usage: python benchmarks/load_test.py [--url http://localhost:5000]
+           [--concurrency 1 8 32] [--duration 10] [--output results.json]
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ENDPOINTS = ("dashboard", "predict")
+TIMES_OF_DAY = ["morning", "afternoon", "evening", "night"]
+DAYS_OF_WEEK = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def prediction_records(connection, count=200):
+    """Valid prediction inputs built from the server's dropdown values"""
+    connection.request("GET", "/api/categorical-values")
+    values = json.loads(connection.getresponse().read())["data"]
+    rng = np.random.default_rng(0)
+    return [
+        {
+            "service_type": str(rng.choice(values["service_types"])),
+            "ward": str(rng.choice(values["wards"])),
+            "division": str(rng.choice(values["divisions"])),
+            "day_of_week": str(rng.choice(DAYS_OF_WEEK)),
+            "time_of_day": str(rng.choice(TIMES_OF_DAY)),
+        }
+        for _ in range(count)
+    ]
+
+
+def request_factory(endpoint, records):
+    if endpoint == "dashboard":
+        return lambda i: ("GET", "/api/dashboard-data", None, {"Accept-Encoding": "gzip"})
+
+    bodies = [json.dumps(record) for record in records]
+    headers = {"Content-Type": "application/json"}
+    return lambda i: ("POST", "/api/predict-completion", bodies[i % len(bodies)], headers)
+
+
+def client(host, port, make_request, deadline, latencies, errors, offset):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    i = offset
+    while time.perf_counter() < deadline:
+        method, path, body, headers = make_request(i)
+        i += 1
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            errors.append(None)
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            errors.append(response.status)
+    connection.close()
+
+
+def run_level(host, port, make_request, concurrency, duration):
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=client, args=(host, port, make_request, deadline, latencies, errors, n * 1000))
+        for n in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2) if len(latencies) else None,
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2) if len(latencies) else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10, help="seconds per endpoint and concurrency level")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    records = prediction_records(http.client.HTTPConnection(host, port, timeout=30))
+
+    results = []
+    for endpoint in args.endpoints:
+        make_request = request_factory(endpoint, records)
+        for concurrency in args.concurrency:
+            result = {"endpoint": endpoint, **run_level(host, port, make_request, concurrency, args.duration)}
+            results.append(result)
+            print(f"{endpoint:>9} c={concurrency:<4} {result['throughput_rps']:9.1f} req/s  "
+                  f"p50 {result['p50_ms']} ms  p99 {result['p99_ms']} ms  errors {result['errors']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"url": args.url, "duration_seconds": args.duration, "results": results}, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""Run the pipeline and API benchmarks on synthetic data and write the results to JSON.
+
+For each scale, generates a synthetic extract (benchmarks/synthetic_data.py)
+in a scratch directory and measures:
+  - load_and_clean_data from the raw CSV, then again from the cleaned cache
+  - generate_chart_data and train_ml_model, from the pipeline's run report
+    (every stage of save_outputs is included under "stages")
+  - make_prediction in-process: per-call latency with a cold and a warm
+    prediction cache, and a make_predictions batch
+  - the HTTP endpoints, served by gunicorn (or Flask's threaded server if
+    gunicorn is not installed) and driven by benchmarks/load_test.py
+
+The scratch directory stands in for the repository root, so data/processed
+in the checkout is never touched. Pass --compare with an earlier results
+file to print the change in every timing.
+
+Usage: python benchmarks/run_benchmarks.py [--rows 10000 100000 1000000]
+           [--output benchmarks/results/run.json] [--compare previous.json]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.load_test import prediction_records, request_factory, run_level
+from benchmarks.synthetic_data import SyntheticSchema, write_csv
+from data_pipeline.data_pipeline import Toronto311Pipeline
+
+RESULTS_DIR = ROOT_DIR / "benchmarks" / "results"
+TRAINING_STAGES = ("build_features", "tune", "fit", "evaluate")
+
+
+def environment():
+    import pandas
+    import sklearn
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "scikit-learn": sklearn.__version__,
+    }
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return round(time.perf_counter() - start, 4)
+
+
+def latency_summary(latencies):
+    latencies_us = np.array(latencies) * 1e6
+    return {
+        "calls": len(latencies),
+        "p50_us": round(float(np.percentile(latencies_us, 50)), 1),
+        "p99_us": round(float(np.percentile(latencies_us, 99)), 1),
+        "calls_per_second": round(len(latencies) / (latencies_us.sum() / 1e6), 1),
+    }
+
+
+def bench_pipeline(csv_path, args):
+    pipeline = Toronto311Pipeline(csv_path=csv_path, build_prediction_table=args.prediction_table,
+                                  n_jobs=args.n_jobs)
+    results = {"load_and_clean_data": timed(pipeline.load_and_clean_data)}
+
+    cached = Toronto311Pipeline(csv_path=csv_path, build_prediction_table=args.prediction_table)
+    results["load_and_clean_data_cached"] = timed(cached.load_and_clean_data)
+
+    results["save_outputs"] = timed(pipeline.save_outputs)
+    stages = {stage.name: stage.to_dict() for stage in pipeline.profiler.stages}
+    results["generate_chart_data"] = stages["chart_data"]["wall_seconds"]
+    results["train_ml_model"] = round(sum(stages[name]["wall_seconds"] for name in TRAINING_STAGES if name in stages), 4)
+    results["peak_rss_mb"] = max(stage["peak_rss_mb"] or 0 for stage in stages.values())
+    results["stages"] = list(stages.values())
+    return results
+
+
+def bench_predictions(count):
+    """make_prediction latency against the outputs in the current directory"""
+    from backend import app as backend
+
+    if not backend.load_data():
+        raise RuntimeError("Backend could not load the pipeline outputs")
+    categorical_values = backend.dashboard_data['categorical_values']
+    rng = np.random.default_rng(0)
+    records = [
+        {
+            "service_type": str(rng.choice(categorical_values['service_types'])),
+            "ward": str(rng.choice(categorical_values['wards'])),
+            "division": str(rng.choice(categorical_values['divisions'])),
+            "day_of_week": str(rng.choice(["monday", "wednesday", "saturday"])),
+            "time_of_day": str(rng.choice(["morning", "afternoon", "evening", "night"])),
+        }
+        for _ in range(count)
+    ]
+
+    # Load the model behind the prediction table up front, as a warm worker would have
+    backend.get_model_data()
+    results = {}
+    for label in ("cold_cache", "warm_cache"):
+        latencies = []
+        for record in records:
+            start = time.perf_counter()
+            backend.make_prediction(record)
+            latencies.append(time.perf_counter() - start)
+        results[label] = latency_summary(latencies)
+        if label == "cold_cache":
+            results["cache_after_cold"] = backend.prediction_cache.stats()
+
+    backend.prediction_cache.clear()
+    batch_seconds = timed(backend.make_predictions, records)
+    results["batch"] = {"records": count, "seconds": batch_seconds,
+                        "records_per_second": round(count / batch_seconds, 1)}
+    return results
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workdir, port, workers):
+    if shutil.which("gunicorn") or _module_available("gunicorn"):
+        command = [sys.executable, "-m", "gunicorn", "-c", str(ROOT_DIR / "backend" / "gunicorn.conf.py"),
+                   "--pythonpath", str(ROOT_DIR), "-b", f"127.0.0.1:{port}", "-w", str(workers),
+                   "backend.wsgi:app"]
+        server = "gunicorn"
+    else:
+        command = [sys.executable, "-c",
+                   f"import sys; sys.path.insert(0, {str(ROOT_DIR)!r}); "
+                   "from backend.app import create_app; "
+                   f"create_app(watch=False).run(host='127.0.0.1', port={port}, threaded=True)"]
+        server = "flask-threaded"
+
+    process = subprocess.Popen(command, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            connection.request("GET", "/api/health")
+            if connection.getresponse().status == 200:
+                return process, server
+        except OSError:
+            time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("API server did not start within 60s")
+
+
+def _module_available(name):
+    import importlib.util
+    return importlib.util.find_spec(name) is not None
+
+
+def bench_http(workdir, args):
+    port = free_port()
+    process, server = start_server(workdir, port, args.workers)
+    try:
+        records = prediction_records(http.client.HTTPConnection("127.0.0.1", port, timeout=30))
+        levels = []
+        for endpoint in ("dashboard", "predict"):
+            make_request = request_factory(endpoint, records)
+            for concurrency in args.concurrency:
+                levels.append({"endpoint": endpoint,
+                               **run_level("127.0.0.1", port, make_request, concurrency, args.duration)})
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {"server": server, "workers": args.workers, "duration_seconds": args.duration, "levels": levels}
+
+
+def flatten_timings(results):
+    """scale/metric -> value for every timing, used by --compare"""
+    flat = {}
+    for scale in results["scales"]:
+        prefix = f"{scale['rows']}"
+        for key in ("load_and_clean_data", "load_and_clean_data_cached", "generate_chart_data", "train_ml_model"):
+            flat[f"{prefix}/{key}_s"] = scale["pipeline"][key]
+        if "predictions" in scale:
+            for label in ("cold_cache", "warm_cache"):
+                flat[f"{prefix}/predict_{label}_p50_us"] = scale["predictions"][label]["p50_us"]
+        for level in scale.get("http", {}).get("levels", []):
+            flat[f"{prefix}/http_{level['endpoint']}_c{level['concurrency']}_p99_ms"] = level["p99_ms"]
+    return flat
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = flatten_timings(json.load(f))
+    print(f"\nChange against {baseline_path} (positive is slower):")
+    for key, value in flatten_timings(results).items():
+        before = baseline.get(key)
+        if before and value is not None:
+            print(f"   {key:<48}{before:>12}{value:>12}{(value - before) / before:>+10.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--output", help="results file (default benchmarks/results/benchmark-<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--prediction-table", action="store_true",
+                        help="also build the prediction table")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="cores used to fit the forest")
+    parser.add_argument("--predictions", type=int, default=2000, help="records scored in the make_prediction benchmark")
+    parser.add_argument("--skip-http", action="store_true", help="skip the HTTP endpoint benchmark")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers for the HTTP benchmark")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=5, help="seconds per endpoint and concurrency level")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch directory with the generated data")
+    args = parser.parse_args()
+
+    results = {
+        "generated_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "options": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "keep")},
+        "scales": [],
+    }
+
+    schema = SyntheticSchema()
+    workdir = Path(tempfile.mkdtemp(prefix="citypulse-bench-"))
+    original_dir = os.getcwd()
+    try:
+        os.chdir(workdir)
+        for rows in args.rows:
+            print(f"\n=== {rows} rows ===")
+            shutil.rmtree(workdir / "data", ignore_errors=True)
+            csv_path = workdir / "data" / "raw" / f"synthetic_{rows}.csv"
+            start = time.perf_counter()
+            size = write_csv(csv_path, rows, seed=args.seed, schema=schema)
+            scale = {"rows": rows, "csv_mb": round(size / 1e6, 1),
+                     "generate_seconds": round(time.perf_counter() - start, 2)}
+
+            scale["pipeline"] = bench_pipeline(str(csv_path), args)
+            scale["predictions"] = bench_predictions(args.predictions)
+            if not args.skip_http:
+                scale["http"] = bench_http(workdir, args)
+            results["scales"].append(scale)
+
+            pipeline = scale["pipeline"]
+            print(f"load {pipeline['load_and_clean_data']}s (cached {pipeline['load_and_clean_data_cached']}s), "
+                  f"charts {pipeline['generate_chart_data']}s, training {pipeline['train_ml_model']}s, "
+                  f"predict p50 {scale['predictions']['warm_cache']['p50_us']}us warm / "
+                  f"{scale['predictions']['cold_cache']['p50_us']}us cold")
+    finally:
+        os.chdir(original_dir)
+        if args.keep:
+            print(f"Scratch data kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Generate synthetic Toronto 311 CSV extracts at any scale.
+
+The output has the raw extract's columns and encoding. Service types,
+wards and divisions come from benchmarks/schema.json, a fixed snapshot of
+the real 2025 extract's insights.json (420 service types, 26 wards, 5
+divisions), so results do not depend on the last pipeline run. The
+distributions are skewed like the real data: service types follow
+the observed top-15 counts and then a Zipf tail, each service type belongs
+to one division with division totals matching the observed split, and
+statuses, wards and hours of the day follow the observed counts. A small
+share of rows has a missing ward or an unparseable date, and a few
+statuses carry trailing whitespace, so the cleaning steps have work to do.
+
+Rows are generated and written in chunks, so 10M-row files do not need
+10M rows in memory. cleaned_frame and creation_date_strings give the
+same distributions already cleaned, for benchmarks of later stages.
+
+Usage: python benchmarks/synthetic_data.py --rows 1000000 --output data/raw/synthetic_1m.csv
+       python benchmarks/synthetic_data.py --update-schema data/processed/insights.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SCHEMA_PATH = Path(__file__).resolve().parent / "schema.json"
+# insights.json keys the schema is built from
+SCHEMA_KEYS = ('date_range', 'service_types', 'ward_distribution', 'division_distribution',
+               'status_distribution', 'hourly_pattern', 'categorical_values')
+
+RAW_COLUMNS = [
+    'Creation Date', 'Status', 'First 3 Chars of Postal Code', 'Intersection Street 1',
+    'Intersection Street 2', 'Ward', 'Service Request Type', 'Division', 'Section'
+]
+CREATION_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+MISSING_WARD_RATE = 0.005
+BAD_DATE_RATE = 0.001
+PADDED_STATUS_RATE = 0.01
+# Requests per weekday relative to Monday
+WEEKDAY_WEIGHTS = np.array([1.0, 1.0, 1.0, 0.97, 0.93, 0.62, 0.55])
+STREETS = ["Yonge St", "Bloor St W", "Queen St E", "Dundas St W", "King St W", "Eglinton Ave E",
+           "Danforth Ave", "Spadina Ave", "Bathurst St", "Lawrence Ave W", "Finch Ave E", "Kingston Rd"]
+
+
+def normalized(weights):
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+
+def observed_weights(values, top_values, top_counts, tail_exponent=1.1):
+    """Weights over values: observed counts for the top values, then a Zipf tail"""
+    top = dict(zip(top_values, top_counts))
+    tail = [value for value in values if value not in top]
+    smallest = min(top_counts) if top_counts else 1.0
+    tail_weights = smallest * np.arange(2, len(tail) + 2, dtype=float) ** -tail_exponent
+    ordered = [value for value in top_values if value in values] + tail
+    return np.array(ordered), normalized([top[value] for value in ordered[:len(ordered) - len(tail)]] + list(tail_weights))
+
+
+def assign_divisions(service_types, service_weights, divisions, division_weights):
+    """Give each service type one division so division totals follow division_weights"""
+    assigned = np.zeros(len(divisions))
+    owners = np.empty(len(service_types), dtype=int)
+    for i in np.argsort(-service_weights, kind='stable'):
+        owner = int(np.argmax(division_weights - assigned))
+        owners[i] = owner
+        assigned[owner] += service_weights[i]
+    return owners
+
+
+def write_schema(insights_path, schema_path=SCHEMA_PATH):
+    """Snapshot the distributions of a real extract's insights.json as the schema"""
+    with open(insights_path) as f:
+        insights = json.load(f)
+    with open(schema_path, 'w') as f:
+        json.dump({key: insights[key] for key in SCHEMA_KEYS}, f, indent=2)
+
+
+class SyntheticSchema:
+    """Vocabularies and distributions for synthetic rows"""
+
+    def __init__(self, schema_path=SCHEMA_PATH):
+        with open(schema_path) as f:
+            insights = json.load(f)
+        values = insights['categorical_values']
+
+        self.service_types, self.service_weights = observed_weights(
+            values['service_types'], insights['service_types']['types'], insights['service_types']['counts'])
+        self.wards, self.ward_weights = observed_weights(
+            values['wards'], insights['ward_distribution']['wards'], insights['ward_distribution']['counts'],
+            tail_exponent=0.3)
+        self.divisions = np.array(insights['division_distribution']['divisions'])
+        division_weights = normalized(insights['division_distribution']['counts'])
+        self.service_division = assign_divisions(self.service_types, self.service_weights, self.divisions, division_weights)
+
+        self.statuses = np.array(insights['status_distribution']['statuses'] + ['Completed'])
+        status_counts = insights['status_distribution']['counts']
+        self.status_weights = normalized(status_counts + [min(status_counts)])
+        self.hour_weights = normalized(insights['hourly_pattern']['counts'])
+        self.start = pd.Timestamp(insights['date_range']['start']).normalize()
+
+        self.postal_codes = np.array([f"M{d}{c}" for d in range(1, 10) for c in "ABCEGHJKLMNPRSTVWXY"])
+        self.sections = np.array([[f"{division} - District {k}" for k in range(1, 5)] for division in self.divisions])
+
+
+def creation_times(schema, rows, rng, days):
+    """Timestamps over days from the schema's start, with weekday and hour skew"""
+    # Pick a day with weekday skew, then an hour from the observed profile
+    day_offsets = np.arange(days)
+    day_weights = normalized(WEEKDAY_WEIGHTS[(schema.start + pd.to_timedelta(day_offsets, unit='D')).dayofweek])
+    day = rng.choice(day_offsets, rows, p=day_weights)
+    hour = rng.choice(24, rows, p=schema.hour_weights)
+    seconds = day * 86400 + hour * 3600 + rng.integers(0, 3600, rows)
+    return schema.start + pd.to_timedelta(seconds, unit='s')
+
+
+def generate_chunk(schema, rows, rng, days):
+    service_index = rng.choice(len(schema.service_types), rows, p=schema.service_weights)
+    division_index = schema.service_division[service_index]
+
+    created = creation_times(schema, rows, rng, days).strftime(CREATION_DATE_FORMAT).to_numpy(dtype=object)
+    created[rng.random(rows) < BAD_DATE_RATE] = "not a date"
+
+    statuses = schema.statuses[rng.choice(len(schema.statuses), rows, p=schema.status_weights)].astype(object)
+    padded = rng.random(rows) < PADDED_STATUS_RATE
+    statuses[padded] = statuses[padded] + " "
+
+    wards = schema.wards[rng.choice(len(schema.wards), rows, p=schema.ward_weights)].astype(object)
+    wards[rng.random(rows) < MISSING_WARD_RATE] = None
+
+    streets = np.array(STREETS, dtype=object)
+    has_intersection = rng.random(rows) < 0.3
+    street_1 = np.where(has_intersection, streets[rng.integers(0, len(streets), rows)], None)
+    street_2 = np.where(has_intersection, streets[rng.integers(0, len(streets), rows)], None)
+
+    sections = schema.sections[division_index, rng.integers(0, schema.sections.shape[1], rows)]
+
+    return pd.DataFrame({
+        'Creation Date': created,
+        'Status': statuses,
+        'First 3 Chars of Postal Code': schema.postal_codes[rng.integers(0, len(schema.postal_codes), rows)],
+        'Intersection Street 1': street_1,
+        'Intersection Street 2': street_2,
+        'Ward': wards,
+        'Service Request Type': schema.service_types[service_index],
+        'Division': schema.divisions[division_index],
+        'Section': sections,
+    }, columns=RAW_COLUMNS)
+
+
+def cleaned_frame(rows, seed=0, days=151, schema=None):
+    """Synthetic rows as the cleaning step leaves them: no missing values, parsed dates and Hour"""
+    schema = schema or SyntheticSchema()
+    rng = np.random.default_rng(seed)
+    service_index = rng.choice(len(schema.service_types), rows, p=schema.service_weights)
+    created = creation_times(schema, rows, rng, days)
+    df = pd.DataFrame({
+        'Status': schema.statuses[rng.choice(len(schema.statuses), rows, p=schema.status_weights)],
+        'Service Request Type': schema.service_types[service_index],
+        'Division': schema.divisions[schema.service_division[service_index]],
+        'Ward': schema.wards[rng.choice(len(schema.wards), rows, p=schema.ward_weights)],
+        'Creation Date': created,
+    })
+    df['Hour'] = df['Creation Date'].dt.hour
+    return df
+
+
+def creation_date_strings(rows, seed=0, days=365, schema=None):
+    """Creation Date strings as they appear in the raw extract, all parseable"""
+    schema = schema or SyntheticSchema()
+    created = creation_times(schema, rows, np.random.default_rng(seed), days)
+    return pd.Series(created.strftime(CREATION_DATE_FORMAT), index=np.arange(rows))
+
+
+def write_csv(path, rows, seed=0, days=151, chunk_rows=500_000, schema=None):
+    """Write rows synthetic records to path; returns the file size in bytes"""
+    schema = schema or SyntheticSchema()
+    rng = np.random.default_rng(seed)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, 'w', encoding='latin1', newline='') as f:
+        written = 0
+        while written < rows:
+            n = min(chunk_rows, rows - written)
+            generate_chunk(schema, n, rng, days).to_csv(f, index=False, header=written == 0)
+            written += n
+    return path.stat().st_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--output", help="CSV file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--days", type=int, default=151, help="Days covered, starting at the real extract's first day")
+    parser.add_argument("--update-schema", metavar="INSIGHTS",
+                        help=f"Rewrite {SCHEMA_PATH.name} from a real extract's insights.json instead")
+    args = parser.parse_args()
+
+    if args.update_schema:
+        write_schema(args.update_schema)
+        print(f"Wrote {SCHEMA_PATH} from {args.update_schema}")
+        return
+    if not args.output:
+        parser.error("--output is required")
+
+    size = write_csv(args.output, args.rows, seed=args.seed, days=args.days)
+    print(f"Wrote {args.rows} rows ({size / 1e6:.1f} MB) to {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Incrementally maintained aggregates behind the dashboard charts"""
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline.aggregation import Dimension, count_groups
+
+# Every group count the dashboard charts need, computed in one pass per chunk
+CHART_DIMENSIONS = [
+    Dimension('daily', 'Creation Date', kind='day'),
+    Dimension('ward', 'Ward'),
+    Dimension('status', 'Status'),
+    Dimension('service', 'Service Request Type'),
+    Dimension('division', 'Division'),
+    Dimension('hourly', 'Hour', kind='int', size=24)
+]
+
+
+class ChartAggregates:
+    """Counts needed by generate_chart_data, updated one frame at a time.
+
+    Feeding the cleaned CSV chunk by chunk gives the same result as one
+    full-frame pass, so memory stays bounded by the chunk size.
+    """
+
+    def __init__(self, dimensions=CHART_DIMENSIONS):
+        self.dimensions = dimensions
+        self.total_records = 0
+        self.counts = {
+            dimension.name: np.zeros(dimension.size, dtype=np.int64) if dimension.kind == 'int' else Counter()
+            for dimension in dimensions
+        }
+        self.start = None
+        self.end = None
+
+    @classmethod
+    def from_frame(cls, df):
+        aggregates = cls()
+        aggregates.update(df)
+        return aggregates
+
+    def update(self, df):
+        """Add a cleaned frame (with Creation Date and Hour columns) to the counts"""
+        if df.empty:
+            return
+
+        self.total_records += len(df)
+
+        for name, counts in count_groups(df, self.dimensions).items():
+            if isinstance(self.counts[name], Counter):
+                self.counts[name].update({label: int(n) for label, n in counts.items()})
+            else:
+                self.counts[name] += counts.to_numpy()
+
+        start, end = df['Creation Date'].min(), df['Creation Date'].max()
+        self.start = start if self.start is None else min(self.start, start)
+        self.end = end if self.end is None else max(self.end, end)
+
+    def to_state(self):
+        """JSON-serializable snapshot, restored with from_state"""
+        state = {
+            "total_records": self.total_records,
+            "start": None if self.start is None else self.start.isoformat(),
+            "end": None if self.end is None else self.end.isoformat()
+        }
+        for name, counts in self.counts.items():
+            state[f"{name}_counts"] = dict(counts) if isinstance(counts, Counter) else [int(x) for x in counts]
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        aggregates = cls()
+        aggregates.total_records = state["total_records"]
+        for name, counts in aggregates.counts.items():
+            saved = state[f"{name}_counts"]
+            aggregates.counts[name] = Counter(saved) if isinstance(counts, Counter) else np.array(saved, dtype=np.int64)
+        aggregates.start = None if state["start"] is None else pd.Timestamp(state["start"])
+        aggregates.end = None if state["end"] is None else pd.Timestamp(state["end"])
+        return aggregates
+
+    def date_range(self):
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat()
+        }
+
+    def to_chart_data(self):
+        """Chart payload in the format served by /api/dashboard-data"""
+        chart_data = {}
+
+        daily_counts = self.counts['daily']
+        dates = sorted(daily_counts)[-30:]
+        chart_data["time_series"] = {
+            "dates": dates,
+            "counts": [daily_counts[date] for date in dates]
+        }
+
+        ward_counts = self.counts['ward'].most_common(15)
+        chart_data["ward_distribution"] = {
+            "wards": [ward for ward, _ in ward_counts],
+            "counts": [count for _, count in ward_counts]
+        }
+
+        status_counts = self.counts['status'].most_common()
+        chart_data["status_distribution"] = {
+            "statuses": [status for status, _ in status_counts],
+            "counts": [count for _, count in status_counts]
+        }
+
+        service_counts = self.counts['service'].most_common(15)
+        chart_data["service_types"] = {
+            "types": [service for service, _ in service_counts],
+            "counts": [count for _, count in service_counts]
+        }
+
+        division_counts = self.counts['division'].most_common(10)
+        chart_data["division_distribution"] = {
+            "divisions": [division for division, _ in division_counts],
+            "counts": [count for _, count in division_counts]
+        }
+
+        chart_data["hourly_pattern"] = {
+            "hours": list(range(24)),
+            "counts": [int(x) for x in self.counts['hourly']]
+        }
+
+        return chart_data
@@ -0,0 +1,78 @@
+"""Group counts over integer codes, shared by the pipeline and the analysis scripts.
+
+Each Dimension turns one column into integer codes plus a label list (the
+codes of a categorical, a factorized label column, calendar day numbers or
+small integers such as hours), and count_groups counts every requested
+dimension with np.bincount over those codes. Adding a chart dimension is a
+matter of declaring it, not writing another groupby.
+"""
+import numpy as np
+import pandas as pd
+
+NANOSECONDS_PER_DAY = 86_400 * 10**9
+
+
+class Dimension:
+    """A named group-by key over one column.
+
+    kind is one of:
+      'label' - string or categorical values, counted per distinct label
+      'day'   - datetimes, counted per calendar day (labels 'YYYY-MM-DD')
+      'int'   - integers in [0, size), e.g. hours; every value is reported
+    """
+
+    def __init__(self, name, column, kind='label', size=None):
+        if kind not in ('label', 'day', 'int'):
+            raise ValueError(f"Unknown dimension kind: {kind}")
+        if kind == 'int' and size is None:
+            raise ValueError("Integer dimensions need a size")
+        self.name = name
+        self.column = column
+        self.kind = kind
+        self.size = size
+
+    def encode(self, series):
+        """Return (codes, labels); codes index into labels and are -1 for missing values"""
+        if self.kind == 'int':
+            values = series.to_numpy()
+            codes = np.where((values >= 0) & (values < self.size), values, -1).astype(np.intp)
+            return codes, np.arange(self.size)
+
+        if self.kind == 'day':
+            values = series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+            valid = series.notna().to_numpy()
+            days = values // NANOSECONDS_PER_DAY
+            if not valid.any():
+                return np.full(len(values), -1, dtype=np.intp), []
+            first = days[valid].min()
+            codes = np.where(valid, days - first, -1).astype(np.intp)
+            last = days[valid].max()
+            labels = np.arange(first, last + 1).astype('datetime64[D]').astype(str)
+            return codes, labels
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.cat.codes.to_numpy().astype(np.intp), series.cat.categories
+        codes, labels = pd.factorize(series)
+        return codes, labels
+
+
+def count_groups(df, dimensions):
+    """Count rows per label for every dimension.
+
+    Returns {dimension name: pd.Series of counts indexed by label}. Label
+    dimensions only include labels that occur; integer dimensions include
+    every value in [0, size), zeros included.
+    """
+    results = {}
+    for dimension in dimensions:
+        codes, labels = dimension.encode(df[dimension.column])
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        series = pd.Series(counts, index=labels, name=dimension.name)
+        results[dimension.name] = series if dimension.kind == 'int' else series[series > 0]
+    return results
+
+
+def top_counts(counts, n=None):
+    """Largest counts first (ties keep label order), like Series.value_counts"""
+    ordered = counts.sort_values(ascending=False, kind='stable')
+    return ordered if n is None else ordered.head(n)
@@ -0,0 +1,79 @@
+"""Shared data layer for the ad-hoc analysis scripts in Pyt/.
+
+load_requests returns the cleaned, typed 311 records through the
+pipeline's own cleaning steps and Parquet cache, so every script reads
+the CSV at most once per change to it (and only once per process), and
+its numbers agree with the dashboard. completion_rates replaces the
+per-row iterrows loops with one bincount per grouping.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline.aggregation import Dimension
+from data_pipeline.clean_cache import CACHED_COLUMNS, CATEGORICAL_COLUMNS
+from data_pipeline.features import COMPLETED_STATUSES
+
+DEFAULT_CSV_PATH = Path("Pyt") / "data" / "SR2025.csv"
+
+# Groupings supported by completion_rates -> cleaned column
+RANKING_DIMENSIONS = {
+    'ward': 'Ward',
+    'division': 'Division',
+    'service_type': 'Service Request Type',
+}
+
+_frames = {}
+
+
+def load_requests(csv_path=DEFAULT_CSV_PATH, use_cache=True):
+    """Cleaned records of a 311 extract, with categorical label columns.
+
+    Columns are Status, Service Request Type, Division, Ward, Creation
+    Date, Month, Weekday and Hour. The frame is shared between callers in
+    the same process, so copy it before modifying it.
+    """
+    key = str(Path(csv_path).resolve())
+    if key not in _frames:
+        # Imported here so scripts that only use the helpers do not load sklearn
+        from data_pipeline.data_pipeline import Toronto311Pipeline
+
+        pipeline = Toronto311Pipeline(csv_path=str(csv_path), use_cache=use_cache)
+        pipeline.load_and_clean_data()
+        df = pipeline.df[CACHED_COLUMNS]
+        _frames[key] = df.astype({col: 'category' for col in CATEGORICAL_COLUMNS if df[col].dtype != 'category'})
+    return _frames[key]
+
+
+def completion_rates(df, by, min_requests=1, completed_statuses=COMPLETED_STATUSES):
+    """Requests, completed requests and completion rate per ward, division or service type.
+
+    Groups with fewer than min_requests requests are dropped, so a type
+    with 2 of 2 requests closed does not outrank busy ones. Sorted by
+    completion rate, then requests, largest first.
+    """
+    if by not in RANKING_DIMENSIONS:
+        raise ValueError(f"by must be one of {', '.join(RANKING_DIMENSIONS)}")
+    codes, labels = Dimension(by, RANKING_DIMENSIONS[by]).encode(df[RANKING_DIMENSIONS[by]])
+    valid = codes >= 0
+    completed = df['Status'].isin(completed_statuses).to_numpy()
+
+    requests = np.bincount(codes[valid], minlength=len(labels))
+    done = np.bincount(codes[valid], weights=completed[valid], minlength=len(labels)).astype(np.int64)
+    rates = pd.DataFrame({
+        'requests': requests,
+        'completed': done,
+        'completion_rate': np.divide(done, requests, out=np.zeros(len(labels)), where=requests > 0),
+    }, index=pd.Index(labels, name=by))
+
+    rates = rates[rates['requests'] >= max(min_requests, 1)]
+    return rates.sort_values(['completion_rate', 'requests'], ascending=False, kind='stable')
+
+
+def most_efficient(df, by, min_requests=1, completed_statuses=COMPLETED_STATUSES):
+    """(label, completion rate) of the best group, or (None, None) if none has enough requests"""
+    rates = completion_rates(df, by, min_requests, completed_statuses)
+    if rates.empty:
+        return None, None
+    return rates.index[0], float(rates['completion_rate'].iloc[0])
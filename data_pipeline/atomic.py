@@ -0,0 +1,26 @@
+"""Atomic file replacement for pipeline outputs read by the running backend"""
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_write(path, mode='w'):
+    """Open a temporary file next to path and rename it over path on success.
+
+    os.replace is atomic within a filesystem, so a reader opening path
+    sees either the previous complete file or the new complete file, never
+    a partially written one. On error the temporary file is removed and
+    path is left untouched.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
@@ -0,0 +1,128 @@
+"""Columnar cache of the cleaned 311 dataset.
+
+Parsing the raw latin1 CSV dominates pipeline runtime, so the cleaned,
+typed columns are written to a Parquet file the first time a CSV is
+processed. Later runs reuse it as long as the source file is unchanged,
+which is checked by size and mtime and, if the mtime moved, a SHA-256 of
+the contents. Parquet support needs pyarrow; without it the cache is
+simply disabled.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+from data_pipeline.atomic import atomic_write
+
+CACHE_DIR = Path("data/cache")
+
+# Bump when the cleaning logic changes so stale caches are rebuilt
+CACHE_VERSION = 3
+
+CATEGORICAL_COLUMNS = ['Status', 'Service Request Type', 'Division', 'Ward']
+CACHED_COLUMNS = CATEGORICAL_COLUMNS + ['Creation Date', 'Month', 'Weekday', 'Hour']
+
+
+def cache_available():
+    return pq is not None
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_schema():
+    label = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [(col, label) for col in CATEGORICAL_COLUMNS] +
+        [('Creation Date', pa.timestamp('ns')),
+         ('Month', pa.int8()),
+         ('Weekday', pa.int8()),
+         ('Hour', pa.int8())]
+    )
+
+
+class CleanedDataCache:
+    """Parquet copy of one CSV's cleaned columns, plus a JSON fingerprint of the source"""
+
+    def __init__(self, csv_path, cache_dir=CACHE_DIR):
+        self.csv_path = Path(csv_path)
+        source_id = hashlib.sha1(str(self.csv_path.resolve()).encode()).hexdigest()[:8]
+        self.path = Path(cache_dir) / f"{self.csv_path.stem}-{source_id}.parquet"
+        self.meta_path = self.path.with_suffix('.json')
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_valid(self):
+        """True if the cache exists and was built from the current source file"""
+        meta = self._read_meta()
+        if not cache_available() or meta is None or not self.path.exists():
+            return False
+        if meta.get('version') != CACHE_VERSION:
+            return False
+
+        stat = os.stat(self.csv_path)
+        source = meta['source']
+        if stat.st_size != source['size']:
+            return False
+        if stat.st_mtime_ns == source['mtime_ns']:
+            return True
+        return file_sha256(self.csv_path) == source['sha256']
+
+    def read(self, columns=None):
+        return pq.read_table(self.path, columns=columns).to_pandas()
+
+    def iter_frames(self, batch_size, columns=None):
+        """Yield the cached frame in batches of at most batch_size rows"""
+        parquet_file = pq.ParquetFile(self.path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield batch.to_pandas()
+
+    def write(self, df):
+        for _ in self.write_chunks([df]):
+            pass
+
+    def write_chunks(self, chunks):
+        """Write cleaned frames to the cache as they are yielded, then pass them on.
+
+        The Parquet file and its fingerprint are only moved into place once
+        every chunk has been written, so an interrupted run leaves no cache.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        stat = os.stat(self.csv_path)
+        schema = cache_schema()
+
+        # Drop the old fingerprint first so a half-replaced cache is never trusted
+        self.meta_path.unlink(missing_ok=True)
+        with atomic_write(self.path, 'wb') as f:
+            with pq.ParquetWriter(f, schema) as writer:
+                for chunk in chunks:
+                    writer.write_table(pa.Table.from_pandas(chunk[CACHED_COLUMNS], schema=schema, preserve_index=False))
+                    yield chunk
+
+        with atomic_write(self.meta_path) as f:
+            json.dump({
+                "version": CACHE_VERSION,
+                "source": {
+                    "path": str(self.csv_path),
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": file_sha256(self.csv_path)
+                }
+            }, f, indent=2)
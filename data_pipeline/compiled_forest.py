@@ -0,0 +1,129 @@
+"""Flat, memory-mappable export of the RandomForest for NumPy-only inference.
+
+All nodes of all trees are stored column-wise in one .npy file: feature,
+threshold, left/right child (absolute node indices, -1 at leaves) and each
+node's completion probability, with the tree roots and feature columns in a
+small JSON sidecar. The backend memory-maps the file, so worker processes
+share its pages, and scores batches by walking every tree level by level
+with vectorized NumPy gathers; neither sklearn nor unpickling is needed.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+from data_pipeline.atomic import atomic_write
+
+FOREST_FILENAME = "forest.npy"
+FOREST_META_FILENAME = "forest.json"
+
+
+def nodes_dtype(node_count):
+    """A single record whose fields are contiguous per-node arrays"""
+    return np.dtype([
+        ('feature', '<i8', (node_count,)),
+        ('threshold', '<f8', (node_count,)),
+        ('left', '<i8', (node_count,)),
+        ('right', '<i8', (node_count,)),
+        ('value', '<f8', (node_count,))
+    ])
+
+
+class CompiledForest:
+    """Binary classification forest with a predict_proba matching sklearn's"""
+
+    def __init__(self, nodes, roots, max_depth, feature_columns):
+        self.nodes = nodes
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = max_depth
+        self.feature_columns = list(feature_columns)
+
+        # Field views into the (possibly memory-mapped) node array, no copies
+        self.feature = nodes['feature']
+        self.threshold = nodes['threshold']
+        self.left = nodes['left']
+        self.right = nodes['right']
+        self.value = nodes['value']
+
+    @classmethod
+    def from_sklearn(cls, model, feature_columns):
+        positive = list(model.classes_).index(1)
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+        nodes = np.zeros((), dtype=nodes_dtype(int(offsets[-1])))
+        for tree, offset in zip(trees, offsets):
+            section = slice(offset, offset + tree.node_count)
+            is_leaf = tree.children_left < 0
+            # Leaves get feature 0 so traversal can index X without masking
+            nodes['feature'][section] = np.where(is_leaf, 0, tree.feature)
+            nodes['threshold'][section] = tree.threshold
+            nodes['left'][section] = np.where(is_leaf, -1, tree.children_left + offset)
+            nodes['right'][section] = np.where(is_leaf, -1, tree.children_right + offset)
+            # Per-tree class probabilities, as sklearn averages them
+            value = tree.value[:, 0, :]
+            nodes['value'][section] = value[:, positive] / value.sum(axis=1)
+
+        max_depth = max(tree.max_depth for tree in trees)
+        return cls(nodes, offsets[:-1], max_depth, feature_columns)
+
+    @property
+    def classes_(self):
+        return np.array([0, 1])
+
+    def predict_proba(self, X, batch_size=2000):
+        X = np.asarray(X, dtype=np.float32)
+        completion = np.empty(len(X), dtype=np.float64)
+
+        for start in range(0, len(X), batch_size):
+            batch = np.ascontiguousarray(X[start:start + batch_size])
+            flat = batch.ravel()
+            row_offsets = (np.arange(len(batch)) * batch.shape[1])[None, :]
+            node = np.repeat(self.roots[:, None], len(batch), axis=1)
+
+            # Leaves point at themselves, so max_depth steps reach every leaf
+            for _ in range(self.max_depth):
+                left = self.left[node]
+                go_left = flat[row_offsets + self.feature[node]] <= self.threshold[node]
+                child = np.where(go_left, left, self.right[node])
+                node = np.where(left < 0, node, child)
+
+            completion[start:start + len(batch)] = self.value[node].mean(axis=0)
+
+        return np.column_stack([1 - completion, completion])
+
+    def verify(self, model, X, atol=1e-9):
+        """Raise ValueError unless predictions match the sklearn model on X"""
+        expected = model.predict_proba(X)[:, list(model.classes_).index(1)]
+        actual = self.predict_proba(X.toarray() if hasattr(X, 'toarray') else X)[:, 1]
+        max_error = float(np.max(np.abs(expected - actual))) if len(expected) else 0.0
+        if max_error > atol:
+            raise ValueError(f"Compiled forest diverges from sklearn (max error {max_error:.2e})")
+        return max_error
+
+    def save(self, directory):
+        directory = Path(directory)
+        with atomic_write(directory / FOREST_FILENAME, 'wb') as f:
+            np.save(f, self.nodes)
+        with atomic_write(directory / FOREST_META_FILENAME) as f:
+            json.dump({
+                "roots": self.roots.tolist(),
+                "max_depth": int(self.max_depth),
+                "feature_columns": self.feature_columns
+            }, f)
+
+    @classmethod
+    def exists(cls, directory):
+        directory = Path(directory)
+        return (directory / FOREST_FILENAME).exists() and (directory / FOREST_META_FILENAME).exists()
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        directory = Path(directory)
+        with open(directory / FOREST_META_FILENAME, 'r') as f:
+            meta = json.load(f)
+        nodes = np.load(directory / FOREST_FILENAME, mmap_mode='r' if mmap else None)
+        node_count = len(nodes['left'])
+        if max(meta['roots'], default=node_count) >= node_count:
+            raise ValueError(f"{FOREST_META_FILENAME} does not match {FOREST_FILENAME}")
+        return cls(nodes, meta['roots'], meta['max_depth'], meta['feature_columns'])
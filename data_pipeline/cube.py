@@ -0,0 +1,353 @@
+"""Sparse data cube of request counts for ad-hoc dashboard queries.
+
+The cleaned records are reduced to one cell per distinct (ward, division,
+service type, status, day, hour) combination with its request count. Cells
+are stored column-wise as category codes in one .npy file, sorted by day,
+with the code labels in a JSON sidecar. Any filter and group-by over those
+dimensions, plus the weekday and month derived from the day, is answered
+from the cells with boolean lookup tables and np.bincount, without
+touching the raw rows: a query over millions of records scans at most a
+few hundred thousand cells. Completion rates come from the status codes.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline.aggregation import Dimension
+from data_pipeline.atomic import atomic_write
+from data_pipeline.features import COMPLETED_STATUSES, DAY_OF_WEEK_INDEX
+
+CUBE_FILENAME = "cube.npy"
+CUBE_META_FILENAME = "cube.json"
+
+# Query dimension -> cleaned column for the dimensions stored as label codes
+LABEL_DIMENSIONS = {
+    'ward': 'Ward',
+    'division': 'Division',
+    'service_type': 'Service Request Type',
+    'status': 'Status',
+}
+QUERY_DIMENSIONS = list(LABEL_DIMENSIONS) + ['date', 'month', 'weekday', 'hour']
+WEEKDAY_NAMES = sorted(DAY_OF_WEEK_INDEX, key=DAY_OF_WEEK_INDEX.get)
+
+# Group-bys with at most this many possible keys are counted with a dense bincount
+DENSE_GROUP_LIMIT = 1 << 22
+
+
+def cube_dtype(cell_count):
+    """A single record whose fields are contiguous per-cell arrays"""
+    return np.dtype([
+        ('ward', '<i2', (cell_count,)),
+        ('division', '<i2', (cell_count,)),
+        ('service_type', '<i2', (cell_count,)),
+        ('status', '<i2', (cell_count,)),
+        ('day', '<i4', (cell_count,)),
+        ('hour', '<i1', (cell_count,)),
+        ('count', '<i4', (cell_count,))
+    ])
+
+
+def parse_date(value):
+    """A query bound as a Timestamp; raises ValueError for anything but a date"""
+    try:
+        timestamp = pd.Timestamp(value)
+    except TypeError:
+        timestamp = pd.NaT
+    if timestamp is pd.NaT:
+        raise ValueError(f"Invalid date: {value!r}")
+    return timestamp
+
+
+def day_number(value):
+    """Days since 1970-01-01 for a date string or timestamp"""
+    return int(np.datetime64(parse_date(value).date(), 'D').astype(np.int64))
+
+
+def filter_value(name, value):
+    """A validated filter value: a label, an hour or weekday number, or months since 1970-01
+
+    Label dimensions take strings; hour and weekday take integers in range
+    (weekday also its name, and both digit strings, as sent in query
+    strings); month takes 'YYYY-MM'. Anything else raises ValueError.
+    """
+    if name in LABEL_DIMENSIONS:
+        if isinstance(value, str):
+            return value
+    elif name in ('hour', 'weekday'):
+        if name == 'weekday' and isinstance(value, str) and value.lower() in DAY_OF_WEEK_INDEX:
+            return DAY_OF_WEEK_INDEX[value.lower()]
+        if isinstance(value, str) and value.isdigit():
+            value = int(value)
+        if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+            if 0 <= value < (24 if name == 'hour' else 7):
+                return int(value)
+    elif name == 'month':
+        if isinstance(value, str):
+            try:
+                return int(np.datetime64(value[:7], 'M').astype(np.int64))
+            except ValueError:
+                pass
+    else:
+        raise ValueError("Filter dates with start and end")
+    raise ValueError(f"Invalid {name} filter value: {value!r}")
+
+
+def filter_values(name, values):
+    """Validated values of one filter (see filter_value)"""
+    if not isinstance(values, (list, tuple)):
+        raise ValueError(f"{name} filter must be a list of values")
+    return [filter_value(name, value) for value in values]
+
+
+class DataCube:
+    """Request counts per cell, queryable by any filter and group-by"""
+
+    def __init__(self, cells, labels):
+        self.cells = cells
+        self.labels = {name: list(labels[name]) for name in LABEL_DIMENSIONS}
+        self.label_index = {
+            name: {label: i for i, label in enumerate(values)} for name, values in self.labels.items()
+        }
+        self.day = cells['day']
+        self.hour = cells['hour']
+        self.count = cells['count']
+
+        completed = np.isin(np.array(self.labels['status'], dtype=object), COMPLETED_STATUSES)
+        self.completed = np.where(completed[cells['status']], self.count, 0)
+
+        self.first_day = int(self.day[0]) if len(self.day) else 0
+        self.last_day = int(self.day[-1]) if len(self.day) else -1
+        self.first_month = int(self._months(np.array([self.first_day]))[0]) if len(self.day) else 0
+
+    @property
+    def cell_count(self):
+        return len(self.count)
+
+    @property
+    def total_records(self):
+        return int(self.count.sum())
+
+    @staticmethod
+    def _months(days):
+        """Calendar months since 1970-01 for day numbers"""
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+    def _codes(self, name, rows):
+        """Codes of a query dimension for the selected cells, and the number of codes"""
+        if name in LABEL_DIMENSIONS:
+            return self.cells[name][rows], len(self.labels[name])
+        if name == 'hour':
+            return self.hour[rows], 24
+        days = self.day[rows].astype(np.int64)
+        if name == 'weekday':
+            # 1970-01-01 was a Thursday
+            return (days + 3) % 7, 7
+        if name == 'date':
+            return days - self.first_day, self.last_day - self.first_day + 1
+        last_month = self._months(np.array([self.last_day]))[0]
+        return self._months(days) - self.first_month, int(last_month - self.first_month + 1)
+
+    def _decode(self, name, codes):
+        """Labels for an array of a query dimension's codes"""
+        if name in LABEL_DIMENSIONS:
+            return np.array(self.labels[name], dtype=object)[codes].tolist()
+        if name == 'hour':
+            return codes.tolist()
+        if name == 'weekday':
+            return [WEEKDAY_NAMES[code].title() for code in codes]
+        if name == 'date':
+            return (codes + self.first_day).astype('datetime64[D]').astype(str).tolist()
+        return (codes + self.first_month).astype('datetime64[M]').astype(str).tolist()
+
+    def _allowed(self, name, values, size):
+        """Boolean lookup table over a dimension's codes for a filter's values"""
+        allowed = np.zeros(size, dtype=bool)
+        for value in filter_values(name, values):
+            if name in LABEL_DIMENSIONS:
+                code = self.label_index[name].get(value)
+            elif name == 'month':
+                code = value - self.first_month
+            else:
+                code = value
+            if code is not None and 0 <= code < size:
+                allowed[code] = True
+        return allowed
+
+    def query(self, filters=None, group_by=(), start=None, end=None, sort=None, limit=None):
+        """Count and completion rate per group for the cells matching the filters.
+
+        filters maps a query dimension to the values to keep (labels,
+        weekday names or numbers, hours, 'YYYY-MM' months); start and end
+        bound the date inclusively. Groups are ordered by count, or by key
+        when every group-by dimension is a time dimension (sort='count' or
+        'key' overrides this).
+        """
+        filters = filters or {}
+        group_by = list(group_by)
+        unknown = [name for name in list(filters) + group_by if name not in QUERY_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimensions: {', '.join(unknown)} (expected {', '.join(QUERY_DIMENSIONS)})")
+        if len(set(group_by)) != len(group_by):
+            raise ValueError("group_by dimensions must be distinct")
+        if sort not in (None, 'count', 'key'):
+            raise ValueError("sort must be 'count' or 'key'")
+
+        # Cells are sorted by day, so the date range is a slice
+        lo = 0 if start is None else int(np.searchsorted(self.day, day_number(start), 'left'))
+        hi = self.cell_count if end is None else int(np.searchsorted(self.day, day_number(end), 'right'))
+        rows = slice(lo, max(lo, hi))
+
+        mask = None
+        for name, values in filters.items():
+            codes, size = self._codes(name, rows)
+            keep = self._allowed(name, values, size)[codes]
+            mask = keep if mask is None else mask & keep
+        if mask is not None:
+            rows = np.flatnonzero(mask) + lo
+
+        count = self.count[rows].astype(np.int64)
+        completed = self.completed[rows].astype(np.int64)
+        result = {"total": self._totals(int(count.sum()), int(completed.sum()))}
+        if not group_by:
+            return result
+
+        codes, sizes = zip(*(self._codes(name, rows) for name in group_by))
+        if np.prod(sizes, dtype=np.float64) <= DENSE_GROUP_LIMIT:
+            keys = np.ravel_multi_index(codes, sizes) if codes[0].size else np.zeros(0, dtype=np.intp)
+            group_counts = np.bincount(keys, weights=count, minlength=int(np.prod(sizes)))
+            group_completed = np.bincount(keys, weights=completed, minlength=len(group_counts))
+            present = np.flatnonzero(group_counts)
+            group_keys = present
+            group_counts, group_completed = group_counts[present], group_completed[present]
+        else:
+            keys = np.ravel_multi_index(codes, sizes)
+            group_keys, inverse = np.unique(keys, return_inverse=True)
+            group_counts = np.bincount(inverse, weights=count, minlength=len(group_keys))
+            group_completed = np.bincount(inverse, weights=completed, minlength=len(group_keys))
+
+        if sort is None:
+            sort = 'count' if any(name in LABEL_DIMENSIONS for name in group_by) else 'key'
+        order = np.argsort(-group_counts, kind='stable') if sort == 'count' else np.arange(len(group_keys))
+        if limit is not None:
+            order = order[:limit]
+
+        group_codes = np.unravel_index(group_keys[order], sizes)
+        group_labels = [self._decode(name, codes) for name, codes in zip(group_by, group_codes)]
+        counts = group_counts[order].astype(np.int64)
+        completed = group_completed[order].astype(np.int64)
+        rates = np.round(completed / counts, 4)
+        result["groups"] = [
+            {**dict(zip(group_by, labels)), "count": c, "completed": done, "completion_rate": rate}
+            for *labels, c, done, rate in zip(*group_labels, counts.tolist(), completed.tolist(), rates.tolist())
+        ]
+        result["group_count"] = len(group_keys)
+        return result
+
+    @staticmethod
+    def _totals(count, completed):
+        return {
+            "count": count,
+            "completed": completed,
+            "completion_rate": round(completed / count, 4) if count else None
+        }
+
+    def save(self, directory):
+        directory = Path(directory)
+        with atomic_write(directory / CUBE_FILENAME, 'wb') as f:
+            np.save(f, self.cells)
+        with atomic_write(directory / CUBE_META_FILENAME) as f:
+            json.dump({"cell_count": self.cell_count, "labels": self.labels}, f)
+
+    @classmethod
+    def exists(cls, directory):
+        directory = Path(directory)
+        return (directory / CUBE_FILENAME).exists() and (directory / CUBE_META_FILENAME).exists()
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        directory = Path(directory)
+        with open(directory / CUBE_META_FILENAME, 'r') as f:
+            meta = json.load(f)
+        cells = np.load(directory / CUBE_FILENAME, mmap_mode='r' if mmap else None)
+        if len(cells['count']) != meta['cell_count']:
+            raise ValueError(f"{CUBE_META_FILENAME} does not match {CUBE_FILENAME}")
+        return cls(cells, meta['labels'])
+
+
+class CubeBuilder:
+    """Accumulate cells from cleaned frames, one chunk at a time.
+
+    Each update reduces its frame to cells right away, so the builder only
+    holds cells, never rows. Starting from an existing cube lets appended
+    records be merged in without re-reading the history.
+    """
+
+    # Re-aggregate the pending cell frames once this many have piled up
+    COMPACT_EVERY = 16
+
+    def __init__(self, cube=None):
+        self.vocabularies = {name: {} for name in LABEL_DIMENSIONS}
+        self.parts = []
+        if cube is not None and cube.cell_count:
+            for name in LABEL_DIMENSIONS:
+                self.vocabularies[name] = dict(cube.label_index[name])
+            self.parts.append(pd.DataFrame({
+                name: np.asarray(cube.cells[name]) for name in cube.cells.dtype.names
+            }))
+
+    def update(self, df):
+        """Add a cleaned frame (with Creation Date and Hour columns)"""
+        if df.empty:
+            return self
+
+        columns = {}
+        valid = np.ones(len(df), dtype=bool)
+        for name, column in LABEL_DIMENSIONS.items():
+            codes, labels = Dimension(name, column).encode(df[column])
+            vocabulary = self.vocabularies[name]
+            mapping = np.array([vocabulary.setdefault(label, len(vocabulary)) for label in labels], dtype=np.int16)
+            valid &= codes >= 0
+            columns[name] = mapping[np.maximum(codes, 0)] if len(mapping) else np.zeros(len(df), dtype=np.int16)
+        columns['day'] = df['Creation Date'].to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int32)
+        columns['hour'] = df['Hour'].to_numpy().astype(np.int8)
+        valid &= df['Creation Date'].notna().to_numpy()
+
+        cells = pd.DataFrame(columns)[valid]
+        self.parts.append(
+            cells.groupby(list(cells.columns), sort=False).size().rename('count').reset_index()
+        )
+        if len(self.parts) >= self.COMPACT_EVERY:
+            self.parts = [self._combine()]
+        return self
+
+    def _combine(self):
+        cells = pd.concat(self.parts, ignore_index=True)
+        keys = [name for name in cells.columns if name != 'count']
+        return cells.groupby(keys, sort=False)['count'].sum().reset_index()
+
+    def build(self):
+        """The cube, with labels sorted and cells ordered by day"""
+        cells = self._combine() if self.parts else pd.DataFrame(
+            {name: np.zeros(0, dtype=np.int64) for name in cube_dtype(0).names})
+
+        labels = {}
+        for name, vocabulary in self.vocabularies.items():
+            ordered = sorted(vocabulary)
+            labels[name] = ordered
+            # Remap insertion-order codes onto the sorted labels
+            remap = np.empty(len(vocabulary), dtype=np.int16)
+            remap[[vocabulary[label] for label in ordered]] = np.arange(len(ordered))
+            if len(cells):
+                cells[name] = remap[cells[name].to_numpy()]
+
+        cells = cells.sort_values(['day', 'hour'] + list(LABEL_DIMENSIONS), kind='stable')
+        array = np.zeros((), dtype=cube_dtype(len(cells)))
+        for name in array.dtype.names:
+            array[name] = cells[name].to_numpy()
+        return DataCube(array, labels)
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls().update(df).build()
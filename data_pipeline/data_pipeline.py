@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 import json
@@ -8,24 +9,165 @@ from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 import joblib
 import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
 from pathlib import Path
 
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from data_pipeline.aggregates import ChartAggregates
+from data_pipeline.atomic import atomic_write
+from data_pipeline.clean_cache import CATEGORICAL_COLUMNS, CleanedDataCache, cache_available
+from data_pipeline.compiled_forest import FOREST_FILENAME, CompiledForest
+from data_pipeline.cube import CUBE_FILENAME, CubeBuilder, DataCube
+from data_pipeline.features import COMPLETED_STATUSES, FeatureEncoder
+from data_pipeline.incremental import AggregateState, csv_watermark
+from data_pipeline.ingest import (
+    ESSENTIAL_COLUMNS, CsvSource, clean_chunks, clean_range, read_cached, resolve_sources, strip_categories
+)
+from data_pipeline.normalization import normalize_categories
+from data_pipeline.prediction_table import PredictionTable
+from data_pipeline.profiling import REPORT_FILENAME, StageProfiler, frame_memory_mb
+from data_pipeline.rollups import ROLLUPS_FILENAME, TimeRollups
+from data_pipeline.store import STORE_FILENAME, RecordStore
+from data_pipeline.time_features import add_time_features, parse_creation_dates
+from data_pipeline.tuning import search_hyperparameters
+
+PROCESSED_DIR = Path("data/processed")
+
+# RandomForest settings used unless a hyperparameter search overrides them
+MODEL_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 15,
+    'min_samples_split': 10,
+    'min_samples_leaf': 5,
+    'random_state': 42,
+    'class_weight': 'balanced'
+}
+STATE_FILENAME = "aggregate_state.json"
+
+def feature_matrix_bytes(X):
+    """Memory held by a dense array or CSR matrix"""
+    if hasattr(X, 'indptr'):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return X.nbytes
+
+def worker_count(n_jobs):
+    """Processes for a joblib-style n_jobs: None or -1 is every core, -2 all but one, ..."""
+    cpus = os.cpu_count() or 1
+    if n_jobs is None:
+        return cpus
+    if n_jobs < 0:
+        return max(1, cpus + 1 + n_jobs)
+    return n_jobs
+
+def n_jobs_arg(value):
+    n_jobs = int(value)
+    if n_jobs == 0:
+        raise argparse.ArgumentTypeError("must be a positive core count or negative (-1 for all cores)")
+    return n_jobs
+
 class Toronto311Pipeline:
-    def __init__(self, csv_path="data/raw/SR2025.csv"):
+    def __init__(self, csv_path="data/raw/SR2025.csv", build_prediction_table=True,
+                 streaming=False, chunksize=200_000, use_cache=True, incremental=False,
+                 sparse_features=True, n_jobs=-1, tune=False, tune_budget=600, cv_folds=3,
+                 profile_dir=None, trace_memory=False, store=False, ingest_workers=None):
         self.csv_path = csv_path
+        # A directory or glob of yearly extracts is cleaned in parallel; so is
+        # a single file if ingest_workers is set above 1
+        self.sources = resolve_sources(csv_path)
+        self.ingest_workers = ingest_workers or (os.cpu_count() if len(self.sources) > 1 else 1)
+        self.store = RecordStore(PROCESSED_DIR) if store else None
+        self.store_written = False
+        self.profiler = StageProfiler(profile_dir=profile_dir, trace_memory=trace_memory)
+        self.n_jobs = n_jobs
+        self.tune = tune
+        self.tune_budget = tune_budget
+        self.cv_folds = cv_folds
+        self.training_info = None
+        self.sparse_features = sparse_features
+        self.incremental = incremental
+        self.watermark = None
+        self.build_prediction_table = build_prediction_table
+        self.streaming = streaming
+        self.chunksize = chunksize
+        self.use_cache = use_cache
         self.df = None
+        self.aggregates = None
+        self.cube_builder = None
         self.model = None
         self.label_encoder = None
         self.feature_columns = None
         self.categorical_encoders = {}
         
     def load_and_clean_data(self):
-        """Load and clean the CSV data"""
+        """Load and clean the CSV data, reusing the columnar cache when the CSV is unchanged"""
+        if len(self.sources) > 1 or self.ingest_workers > 1:
+            with self.profiler.stage("parallel_ingest") as stage:
+                if len(self.sources) == 1:
+                    self.watermark = csv_watermark(self.csv_path)
+                self.load_and_clean_data_streaming(self.iter_parallel_chunks())
+                stage.measure_frame(self.df)
+            return
+        
+        # Assumes the extract is not appended to while the pipeline runs
+        self.watermark = csv_watermark(self.csv_path)
+        
+        cache = None
+        if self.use_cache:
+            if cache_available():
+                cache = CleanedDataCache(self.csv_path)
+            else:
+                print("pyarrow not installed - cleaned data cache disabled")
+        
+        if cache is not None and cache.is_valid():
+            print(f"Loading cleaned data from cache {cache.path}...")
+            with self.profiler.stage("read_cache") as stage:
+                if self.streaming:
+                    self.load_and_clean_data_streaming(cache.iter_frames(self.chunksize))
+                else:
+                    self.df = cache.read()
+                    print(f"Cleaned data: {len(self.df)} records remaining")
+                stage.measure_frame(self.df)
+            return
+        
+        if self.streaming:
+            # Reading, cleaning and caching are interleaved per chunk
+            with self.profiler.stage("stream_csv") as stage:
+                chunks = self.iter_csv_chunks()
+                if cache is not None:
+                    chunks = cache.write_chunks(chunks)
+                self.load_and_clean_data_streaming(chunks)
+                if cache is not None:
+                    print(f"Cached cleaned data to {cache.path}")
+                stage.measure_frame(self.df)
+            return
+        
         print("Loading CSV data...")
         
     
-        self.df = pd.read_csv(self.csv_path, encoding="latin1", on_bad_lines="skip")
-        self.df.columns = self.df.columns.str.strip()
+        # Only the essential columns are read, with the labels as categoricals
+        # (integer codes into one sorted dictionary per column) rather than a
+        # string per row; Creation Date stays datetime64 and the calendar
+        # features are int8, so groupbys and feature building run on codes
+        with self.profiler.stage("read_csv") as stage:
+            source = CsvSource(self.csv_path)
+            raw_names = {canonical: raw for raw, canonical in source.columns.items()}
+            self.df = pd.read_csv(
+                self.csv_path,
+                encoding=source.encoding,
+                encoding_errors="replace",
+                on_bad_lines="skip",
+                usecols=[raw_names[col] for col in ESSENTIAL_COLUMNS],
+                dtype={raw_names[col]: 'category' for col in CATEGORICAL_COLUMNS} | {raw_names['Creation Date']: str}
+            )
+            self.df = self.df.rename(columns=source.columns)
+            stage.measure_frame(self.df)
         
         print(f"Loaded {len(self.df)} records")
         print(f"Columns: {list(self.df.columns)}")
@@ -34,109 +176,176 @@ class Toronto311Pipeline:
         print("Cleaning data...")
         
        
-        essential_cols = ['Status', 'Service Request Type', 'Division', 'Ward', 'Creation Date']
         initial_count = len(self.df)
-        self.df = self.df.dropna(subset=essential_cols)
+        with self.profiler.stage("drop_missing") as stage:
+            self.df = self.df.dropna(subset=ESSENTIAL_COLUMNS)
+            stage.measure_frame(self.df)
         print(f"Removed {initial_count - len(self.df)} rows with missing essential data")
         
     
-        self.df['Creation Date'] = pd.to_datetime(self.df['Creation Date'], errors='coerce')
-        self.df = self.df.dropna(subset=['Creation Date'])
+        with self.profiler.stage("parse_dates") as stage:
+            self.df['Creation Date'] = parse_creation_dates(self.df['Creation Date'])
+            self.df = self.df.dropna(subset=['Creation Date']).reset_index(drop=True)
+            stage.measure_frame(self.df)
         
      
-        self.df['Date'] = self.df['Creation Date'].dt.date
-        self.df['Month'] = self.df['Creation Date'].dt.month
-        self.df['Weekday'] = self.df['Creation Date'].dt.dayofweek
-        self.df['Hour'] = self.df['Creation Date'].dt.hour
-        self.df['DayOfWeek'] = self.df['Creation Date'].dt.day_name()
-        
-      
-        self.df['Status'] = self.df['Status'].str.strip()
-        
-        print(f"Cleaned data: {len(self.df)} records remaining")
+        with self.profiler.stage("derive_columns") as stage:
+            add_time_features(self.df)
+            
+          
+            self.df['Status'] = strip_categories(self.df['Status'])
+            for col in CATEGORICAL_COLUMNS:
+                self.df[col] = self.df[col].cat.remove_unused_categories()
+            stage.measure_frame(self.df)
+        
+        # Map service-type aliases to their canonical labels, once per distinct label
+        with self.profiler.stage("normalize_labels") as stage:
+            self.df['Service Request Type'] = normalize_categories(self.df['Service Request Type'])
+            stage.measure_frame(self.df)
+        
+        print(f"Cleaned data: {len(self.df)} records remaining ({frame_memory_mb(self.df):.1f} MB in memory)")
+        
+        if cache is not None:
+            with self.profiler.stage("write_cache", rows=len(self.df)):
+                cache.write(self.df)
+            print(f"Cached cleaned data to {cache.path}")
+        
+    def iter_csv_chunks(self, start_offset=0, end_offset=None):
+        """Yield cleaned chunks of the CSV (see ingest.clean_chunks)"""
+        print(f"Streaming CSV data in chunks of {self.chunksize}...")
+        stats = {}
+        yield from clean_chunks(CsvSource(self.csv_path), self.chunksize, start_offset, end_offset, stats)
+        print(f"Loaded {stats.get('rows_read', 0)} records")
+        
+    def iter_parallel_chunks(self):
+        """Yield cleaned chunks of every source file, cleaned in a process pool
+        
+        Each file is split into byte ranges that workers clean
+        independently; results come back in file and range order, so the
+        output does not depend on the number of workers. Files with a valid
+        cache are read from it instead, and other files are cached as their
+        ranges arrive.
+        """
+        tasks = []
+        caches = {}
+        for path in self.sources:
+            cache = CleanedDataCache(path) if self.use_cache and cache_available() else None
+            if cache is not None and cache.is_valid():
+                tasks.append((path, read_cached, (str(path),)))
+                continue
+            caches[path] = cache
+            source = CsvSource(path)
+            ranges = source.byte_ranges() if source.splittable else [(0, None)]
+            tasks.extend((path, clean_range, (source, start, end, self.chunksize)) for start, end in ranges)
+        
+        print(f"Cleaning {len(self.sources)} file(s) as {len(tasks)} tasks on {self.ingest_workers} workers...")
+        with ProcessPoolExecutor(max_workers=self.ingest_workers) as pool:
+            # At most 2 tasks per worker are in flight or waiting to be
+            # consumed, so memory does not grow with the number of files
+            tasks = iter(tasks)
+            pending = deque()
+            
+            def submit_next():
+                task = next(tasks, None)
+                if task is not None:
+                    path, func, args = task
+                    pending.append((path, pool.submit(func, *args)))
+            
+            def results():
+                while pending:
+                    path, future = pending.popleft()
+                    chunks = future.result()
+                    submit_next()
+                    yield path, chunks
+            
+            for _ in range(2 * self.ingest_workers):
+                submit_next()
+            for path, group in groupby(results(), key=lambda item: item[0]):
+                chunks = (chunk for _, result in group for chunk in result)
+                if caches.get(path) is not None:
+                    chunks = caches[path].write_chunks(chunks)
+                yield from chunks
+        
+    def load_and_clean_data_streaming(self, chunks):
+        """Fold cleaned chunks into aggregates and a compact training frame
+        
+        Each chunk is added to self.aggregates and then reduced to the
+        categorical and small-integer columns the model needs, so peak
+        memory is bounded by the chunk size rather than the file size.
+        """
+        self.aggregates = ChartAggregates()
+        self.cube_builder = CubeBuilder()
+        training_chunks = []
+        if self.store is not None:
+            chunks = self.store.write_chunks(chunks, self.csv_path, self.watermark)
+        
+        for chunk in chunks:
+            self.aggregates.update(chunk)
+            self.cube_builder.update(chunk)
+            training_chunks.append(chunk.drop(columns=['Creation Date']))
+        
+        if not training_chunks:
+            raise ValueError(f"No records found in {self.csv_path}")
+        
+        # Merge chunk categoricals into one sorted dictionary per column
+        self.df = pd.DataFrame({
+            col: pd.api.types.union_categoricals(
+                [chunk[col] for chunk in training_chunks], sort_categories=True
+            ).remove_unused_categories()
+            if col in CATEGORICAL_COLUMNS else
+            np.concatenate([chunk[col].to_numpy() for chunk in training_chunks])
+            for col in training_chunks[0].columns
+        })
+        
+        self.store_written = self.store is not None
+        print(f"Cleaned data: {len(self.df)} records remaining ({frame_memory_mb(self.df):.1f} MB in memory)")
         
     def generate_chart_data(self):
         """Generate data specifically for dynamic charts"""
         print("Generating chart data...")
         
-        chart_data = {}
-        
-
-        daily_counts = self.df.groupby('Date').size().reset_index(name='count')
-        daily_counts['Date'] = daily_counts['Date'].astype(str)
+        if self.store is not None:
+            if not self.store_written:
+                with self.profiler.stage("write_store", rows=len(self.df)):
+                    self.store.write(self.df, csv_path=self.csv_path, watermark=self.watermark)
+                self.store_written = True
+                print(f"Saved cleaned records to {self.store.path}")
+            with self.profiler.stage("chart_data") as stage:
+                chart_data = self.store.chart_data()
+                stage.rows = sum(chart_data['hourly_pattern']['counts'])
+                return chart_data
+        
+        with self.profiler.stage("chart_data") as stage:
+            if self.aggregates is None:
+                self.aggregates = ChartAggregates.from_frame(self.df)
+            stage.rows = self.aggregates.total_records
+            return self.aggregates.to_chart_data()
     
-        chart_data["time_series"] = {
-            "dates": daily_counts['Date'].tolist()[-30:],
-            "counts": [int(x) for x in daily_counts['count'].tolist()[-30:]]
-        }
-        
-      
-        ward_counts = self.df['Ward'].value_counts().head(15)
-        chart_data["ward_distribution"] = {
-            "wards": ward_counts.index.tolist(),
-            "counts": [int(x) for x in ward_counts.values.tolist()]
-        }
-        
-        
-        status_counts = self.df['Status'].value_counts()
-        chart_data["status_distribution"] = {
-            "statuses": status_counts.index.tolist(),
-            "counts": [int(x) for x in status_counts.values.tolist()]
-        }
-        
-        service_counts = self.df['Service Request Type'].value_counts().head(15)
-        chart_data["service_types"] = {
-            "types": service_counts.index.tolist(),
-            "counts": [int(x) for x in service_counts.values.tolist()]
-        }
-        
-        
-        division_counts = self.df['Division'].value_counts().head(10)
-        chart_data["division_distribution"] = {
-            "divisions": division_counts.index.tolist(),
-            "counts": [int(x) for x in division_counts.values.tolist()]
-        }
-        
-        
-        hourly_counts = self.df.groupby('Hour').size()
-        chart_data["hourly_pattern"] = {
-            "hours": list(range(24)),
-            "counts": [int(hourly_counts.get(h, 0)) for h in range(24)]
-        }
-        
-        return chart_data
+    def record_summary(self):
+        """Total records and creation date range, from the store or the aggregates"""
+        if self.aggregates is None:
+            return self.store.summary()
+        return self.aggregates.total_records, self.aggregates.date_range()
     
     def train_ml_model(self):
         """Train ML model for completion prediction"""
         print("Training ML model for completion prediction...")
         
         
-        completed_statuses = ['Closed', 'Completed']
-        self.df['Completed'] = self.df['Status'].isin(completed_statuses).astype(int)
+        self.df['Completed'] = self.df['Status'].isin(COMPLETED_STATUSES).astype(np.int8)
         
         print(f"Completion rate: {self.df['Completed'].mean():.2%}")
         
         
-        categorical_features = ['Service Request Type', 'Division', 'Ward']
-        
-       
-        feature_data = []
+        # The backend rebuilds this encoder from feature_columns, so training
+        # and serving always agree on the feature layout
+        with self.profiler.stage("build_features", rows=len(self.df)):
+            encoder = FeatureEncoder.from_frame(self.df)
+            X = encoder.transform(self.df, sparse_output=self.sparse_features)
+            y = self.df['Completed']
         
        
-        for col in categorical_features:
-            encoded = pd.get_dummies(self.df[col], prefix=col, drop_first=True)
-            feature_data.append(encoded)
-        
-        
-        temporal_features = self.df[['Month', 'Weekday', 'Hour']]
-        feature_data.append(temporal_features)
-        
-       
-        X = pd.concat(feature_data, axis=1)
-        y = self.df['Completed']
-        
-       
-        self.feature_columns = X.columns.tolist()
+        self.feature_columns = encoder.feature_columns
         
         
         self.categorical_values = {
@@ -145,7 +354,7 @@ class Toronto311Pipeline:
             'wards': sorted(self.df['Ward'].unique().tolist())
         }
         
-        print(f"Feature matrix shape: {X.shape}")
+        print(f"Feature matrix shape: {X.shape} ({'sparse' if self.sparse_features else 'dense'}, {feature_matrix_bytes(X) / 1e6:.1f} MB)")
         print(f"Features: {len(self.feature_columns)} total")
         
         
@@ -153,21 +362,32 @@ class Toronto311Pipeline:
             X, y, test_size=0.3, random_state=42, stratify=y
         )
         
+        model_params = dict(MODEL_PARAMS)
+        search = None
+        if self.tune:
+            print(f"Searching hyperparameters ({self.cv_folds}-fold CV, {self.tune_budget}s budget)...")
+            with self.profiler.stage("tune", rows=X_train.shape[0]):
+                search = search_hyperparameters(
+                    X_train, y_train, MODEL_PARAMS, time_budget=self.tune_budget, cv=self.cv_folds,
+                    n_workers=worker_count(self.n_jobs)
+                )
+            model_params.update(search['best_params'])
+            print(f"   Evaluated {search['candidates_evaluated']}/{search['candidates_total']} candidates "
+                  f"in {search['search_seconds']}s")
+            print(f"   Best params: {search['best_params']} (CV F1 {search['best_mean_f1']:.3f})")
        
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=15,
-            min_samples_split=10,
-            min_samples_leaf=5,
-            random_state=42,
-            class_weight='balanced'
-        )
+        self.model = RandomForestClassifier(**model_params, n_jobs=self.n_jobs)
         
-        self.model.fit(X_train, y_train)
+        fit_start = time.perf_counter()
+        with self.profiler.stage("fit", rows=X_train.shape[0]):
+            self.model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - fit_start
+        print(f"Model fit in {fit_seconds:.1f}s (n_jobs={self.n_jobs})")
         
         
-        y_pred = self.model.predict(X_test)
-        y_pred_proba = self.model.predict_proba(X_test)
+        with self.profiler.stage("evaluate", rows=X_test.shape[0]):
+            y_pred = self.model.predict(X_test)
+            y_pred_proba = self.model.predict_proba(X_test)
         
       
         accuracy = accuracy_score(y_test, y_pred)
@@ -181,6 +401,26 @@ class Toronto311Pipeline:
         print(f"   Recall:    {recall:.3f}")
         print(f"   F1-Score:  {f1:.3f}")
         
+        # Held out rows used to check the compiled forest against sklearn
+        self.verification_sample = X_test[:2000]
+        
+        self.training_info = {
+            "trained_at": datetime.now().isoformat(),
+            "params": model_params,
+            "n_jobs": self.n_jobs,
+            "fit_seconds": round(fit_seconds, 2),
+            "training_rows": int(X_train.shape[0]),
+            "features": len(self.feature_columns),
+            "sparse_features": self.sparse_features,
+            "metrics": {
+                "accuracy": round(accuracy, 4),
+                "precision": round(precision, 4),
+                "recall": round(recall, 4),
+                "f1": round(f1, 4)
+            },
+            "search": search
+        }
+        
         
         feature_importance = pd.DataFrame({
             'feature': self.feature_columns,
@@ -197,65 +437,285 @@ class Toronto311Pipeline:
         print(" Saving outputs...")
         
        
-        processed_dir = Path("data/processed")
+        processed_dir = PROCESSED_DIR
         processed_dir.mkdir(parents=True, exist_ok=True)
         
+        # A store from an earlier --store run would no longer match the new outputs
+        if self.store is None and RecordStore.exists(processed_dir):
+            RecordStore.remove(processed_dir)
+            print(f"Removed outdated record store {processed_dir / STORE_FILENAME}")
+        
        
         chart_data = self.generate_chart_data()
         
         
         feature_importance = self.train_ml_model()
+        total_records, date_range = self.record_summary()
         
        
         dashboard_data = {
             "generated_at": datetime.now().isoformat(),
-            "total_records": int(len(self.df)),  # Convert to int
-            "date_range": {
-                "start": self.df['Creation Date'].min().isoformat(),
-                "end": self.df['Creation Date'].max().isoformat()
-            },
+            "total_records": int(total_records),  # Convert to int
+            "date_range": date_range,
             **chart_data,
             "feature_importance": feature_importance,
             "categorical_values": self.categorical_values
         }
         
-       
-        insights_path = processed_dir / "insights.json"
-        with open(insights_path, 'w') as f:
-            json.dump(dashboard_data, f, indent=2)
-        print(f" Saved chart data to {insights_path}")
-        
-       
         model_data = {
             'model': self.model,
             'feature_columns': self.feature_columns,
             'categorical_values': self.categorical_values
         }
         
+        # Every artifact is swapped in with atomic_write so the backend never
+        # reads a torn file; insights.json goes last and marks the run complete
         model_path = processed_dir / "model.joblib"
-        joblib.dump(model_data, model_path)
+        with self.profiler.stage("write_model"), atomic_write(model_path, 'wb') as f:
+            joblib.dump(model_data, f)
         print(f"Saved ML model to {model_path}")
         
+        with self.profiler.stage("compile_forest"):
+            forest = CompiledForest.from_sklearn(self.model, self.feature_columns)
+            max_error = forest.verify(self.model, self.verification_sample)
+            forest.save(processed_dir)
+        print(f"Saved compiled forest to {processed_dir / FOREST_FILENAME} (max deviation from sklearn {max_error:.1e})")
+        
+        meta_path = processed_dir / "model_meta.json"
+        with atomic_write(meta_path) as f:
+            json.dump(self.training_info, f, indent=2)
+        print(f"Saved training parameters and timing to {meta_path}")
+        
+        if self.build_prediction_table:
+            print("Precomputing prediction table...")
+            with self.profiler.stage("prediction_table") as stage:
+                service_divisions = (
+                    self.df[['Service Request Type', 'Division']]
+                    .drop_duplicates()
+                    .sort_values(['Service Request Type', 'Division'])
+                    .itertuples(index=False, name=None)
+                )
+                table = PredictionTable.build(
+                    forest,
+                    FeatureEncoder(self.feature_columns),
+                    list(service_divisions),
+                    self.categorical_values['wards']
+                )
+                table.save(processed_dir)
+                stage.rows = int(table.probabilities.size)
+            print(f"Saved prediction table {table.shape} to {processed_dir}")
+        elif PredictionTable.exists(processed_dir):
+            # The backend would keep answering from the previous model's table
+            PredictionTable.remove(processed_dir)
+            print(f"Removed outdated prediction table from {processed_dir}")
+        
+        with self.profiler.stage("data_cube") as stage:
+            if self.cube_builder is None:
+                self.cube_builder = CubeBuilder().update(self.df)
+            cube = self.cube_builder.build()
+            cube.save(processed_dir)
+            stage.rows = cube.cell_count
+        print(f"Saved data cube with {cube.cell_count} cells to {processed_dir / CUBE_FILENAME}")
+        
+        with self.profiler.stage("rollups") as stage:
+            rollups = TimeRollups.from_cube(cube)
+            rollups.save(processed_dir)
+            stage.rows = rollups.series_count
+        print(f"Saved time-series rollups for {rollups.series_count} series to {processed_dir / ROLLUPS_FILENAME}")
+        
+        insights_path = processed_dir / "insights.json"
+        with self.profiler.stage("write_insights"):
+            with atomic_write(insights_path) as f:
+                json.dump(dashboard_data, f, indent=2)
+            if self.aggregates is not None and self.watermark is not None:
+                AggregateState(self.csv_path, self.watermark, self.aggregates).save(processed_dir / STATE_FILENAME)
+            else:
+                # Charts came from the store, or from several files, so there
+                # is no single-CSV state for --incremental to extend
+                (processed_dir / STATE_FILENAME).unlink(missing_ok=True)
+        print(f" Saved chart data to {insights_path}")
+        
+    def update_incrementally(self):
+        """Merge rows appended since the last run into the stored aggregates
+        
+        Rewrites the chart data in insights.json; the model, feature
+        importance and dropdown values are kept from the last full run.
+        Returns False if there is no usable state for this CSV, in which
+        case a full run is needed.
+        """
+        state_path = PROCESSED_DIR / STATE_FILENAME
+        insights_path = PROCESSED_DIR / "insights.json"
+        
+        if len(self.sources) > 1:
+            print("Incremental runs need a single CSV - running full pipeline")
+            return False
+        
+        state = AggregateState.load(state_path)
+        if state is None or not insights_path.exists() or not state.matches(self.csv_path):
+            print("No usable incremental state for this CSV - running full pipeline")
+            return False
+        
+        # The record store is only extended if it holds exactly the rows the
+        # state covers; without --store, it is removed rather than left stale
+        if self.store is None:
+            if RecordStore.exists(PROCESSED_DIR):
+                RecordStore.remove(PROCESSED_DIR)
+                print(f"Removed outdated record store {PROCESSED_DIR / STORE_FILENAME}")
+        elif not self.store.matches(self.csv_path, state.offset):
+            print("Record store does not match the incremental state - running full pipeline")
+            return False
+        
+        self.watermark = csv_watermark(self.csv_path)
+        self.aggregates = state.aggregates
+        if self.watermark == state.offset:
+            print("No new records since the last run")
+            return True
+        
+        # The cube (and the rollups derived from it) are extended in place;
+        # without them, they are built by the next full run
+        cube_builder = None
+        if DataCube.exists(PROCESSED_DIR):
+            cube_builder = CubeBuilder(DataCube.load(PROCESSED_DIR, mmap=False))
+        new_chunks = []
+        
+        previous_total = self.aggregates.total_records
+        with self.profiler.stage("incremental_merge") as stage:
+            for chunk in self.iter_csv_chunks(start_offset=state.offset, end_offset=self.watermark):
+                self.aggregates.update(chunk)
+                if cube_builder is not None:
+                    cube_builder.update(chunk)
+                if self.store is not None:
+                    new_chunks.append(chunk)
+            stage.rows = self.aggregates.total_records - previous_total
+        print(f"Merged {self.aggregates.total_records - previous_total} new records")
+        
+        if cube_builder is not None:
+            with self.profiler.stage("data_cube") as stage:
+                cube = cube_builder.build()
+                cube.save(PROCESSED_DIR)
+                stage.rows = cube.cell_count
+            with self.profiler.stage("rollups") as stage:
+                rollups = TimeRollups.from_cube(cube)
+                rollups.save(PROCESSED_DIR)
+                stage.rows = rollups.series_count
+        
+        if self.store is not None:
+            with self.profiler.stage("append_store") as stage:
+                stage.rows = self.store.append(new_chunks, self.watermark)
+        
+        with self.profiler.stage("write_insights"):
+            with open(insights_path, 'r') as f:
+                dashboard_data = json.load(f)
+            dashboard_data.update({
+                "generated_at": datetime.now().isoformat(),
+                "total_records": int(self.aggregates.total_records),
+                "date_range": self.aggregates.date_range(),
+                **self.aggregates.to_chart_data()
+            })
+            with atomic_write(insights_path) as f:
+                json.dump(dashboard_data, f, indent=2)
+            AggregateState(self.csv_path, self.watermark, self.aggregates).save(state_path)
+        print(f" Saved chart data to {insights_path}")
+        return True
+        
     def run_pipeline(self):
         """Run the complete pipeline"""
         print(" Starting Toronto 311 Data Pipeline...")
         
+        mode = "full"
         try:
-            self.load_and_clean_data()
-            self.save_outputs()
-            print("\n Pipeline completed successfully!")
-            print("   Generated:")
-            print("   Dynamic chart data for frontend")
-            print("   ML model for completion predictions")
-            print("\n Ready to start Flask backend!")
+            if self.incremental and self.update_incrementally():
+                mode = "incremental"
+                print("\n Incremental update completed successfully!")
+            else:
+                self.load_and_clean_data()
+                self.save_outputs()
+                print("\n Pipeline completed successfully!")
+                print("   Generated:")
+                print("   Dynamic chart data for frontend")
+                print("   ML model for completion predictions")
+                print("\n Ready to start Flask backend!")
             
         except Exception as e:
             print(f" Pipeline failed: {str(e)}")
+            self.save_run_report(mode, status="failed", error=str(e))
             raise
+        
+        self.save_run_report(mode)
+        
+    def save_run_report(self, mode, **report_args):
+        """Write per-stage timings and memory to run_report.json next to insights.json"""
+        self.profiler.print_summary()
+        PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+        report_path = PROCESSED_DIR / REPORT_FILENAME
+        self.profiler.save(
+            report_path,
+            **report_args,
+            csv_path=str(self.csv_path),
+            sources=[str(path) for path in self.sources],
+            ingest_workers=self.ingest_workers,
+            mode=mode,
+            streaming=self.streaming,
+            store=self.store is not None,
+            sparse_features=self.sparse_features,
+            n_jobs=self.n_jobs,
+            tune=self.tune
+        )
+        print(f"Saved run report to {report_path}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Toronto 311 data pipeline")
+    parser.add_argument("--csv-path", default="data/raw/SR2025.csv",
+                        help="Raw 311 CSV extract, or a directory or quoted glob of yearly extracts")
+    parser.add_argument("--ingest-workers", type=int,
+                        help="Processes cleaning CSV byte ranges in parallel (default: all cores for several files, "
+                             "1 for a single file)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read the CSV in chunks so memory is bounded by the chunk size")
+    parser.add_argument("--chunksize", type=int, default=200_000, help="Rows per chunk in streaming mode")
+    parser.add_argument("--no-prediction-table", action="store_true",
+                        help="Skip precomputing the prediction lookup table")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only read rows appended since the last run and merge them into the chart data")
+    parser.add_argument("--dense-features", action="store_true",
+                        help="Train on a dense feature matrix instead of a sparse CSR one")
+    parser.add_argument("--n-jobs", type=n_jobs_arg, default=-1,
+                        help="Cores used to fit the forest (-1 for all, -2 for all but one, ...)")
+    parser.add_argument("--tune", action="store_true",
+                        help="Run a cross-validated hyperparameter search before the final fit")
+    parser.add_argument("--tune-budget", type=float, default=600,
+                        help="Seconds after which the search stops starting new fits")
+    parser.add_argument("--cv-folds", type=int, default=3, help="Cross-validation folds for --tune")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always parse the raw CSV instead of reusing the cleaned Parquet cache")
+    parser.add_argument("--profile-dir",
+                        help="Run each stage under cProfile and write NN-<stage>.prof files to this directory")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Record each stage's peak Python allocations and top allocation sites with tracemalloc")
+    parser.add_argument("--store", action="store_true",
+                        help=f"Load the cleaned records into data/processed/{STORE_FILENAME} and compute the chart data in SQL")
+    return parser.parse_args()
 
 def main():
     """Main execution function"""
-    pipeline = Toronto311Pipeline()
+    args = parse_args()
+    pipeline = Toronto311Pipeline(
+        csv_path=args.csv_path,
+        build_prediction_table=not args.no_prediction_table,
+        streaming=args.stream,
+        chunksize=args.chunksize,
+        use_cache=not args.no_cache,
+        incremental=args.incremental,
+        sparse_features=not args.dense_features,
+        n_jobs=args.n_jobs,
+        tune=args.tune,
+        tune_budget=args.tune_budget,
+        cv_folds=args.cv_folds,
+        profile_dir=args.profile_dir,
+        trace_memory=args.trace_memory,
+        store=args.store,
+        ingest_workers=args.ingest_workers
+    )
     pipeline.run_pipeline()
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""Feature encoding shared by model training and the prediction API"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+CATEGORICAL_FEATURES = ['Service Request Type', 'Division', 'Ward']
+TEMPORAL_FEATURES = ['Month', 'Weekday', 'Hour']
+
+# Prediction inputs are coarse: a time of day and a day of week, mapped onto
+# the Hour and Weekday features the model was trained on
+TIME_OF_DAY_HOURS = {
+    'morning': 9, 'afternoon': 14, 'evening': 19, 'night': 2
+}
+DEFAULT_HOUR = 12
+DAY_OF_WEEK_INDEX = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6
+}
+DEFAULT_WEEKDAY = 1
+
+# Statuses counted as a completed request, the model's positive class
+COMPLETED_STATUSES = ['Closed', 'Completed']
+
+# Every Hour value a prediction request can produce
+HOUR_BUCKETS = sorted(set(TIME_OF_DAY_HOURS.values()) | {DEFAULT_HOUR})
+
+
+class FeatureEncoder:
+    """Encode records into rows matching the model's feature columns.
+
+    The (field, value) -> column index lookup is built once from the
+    training feature columns, so encoding a record only touches the columns
+    it sets instead of scanning every dummy column. Categories dropped by
+    drop_first (and unseen categories) have no column and encode as zeros.
+    """
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build the encoder for a training frame.
+
+        Columns follow pd.get_dummies(drop_first=True) per categorical
+        feature: one column per sorted category except the first, followed
+        by the temporal features.
+        """
+        feature_columns = []
+        for field in CATEGORICAL_FEATURES:
+            categories = sorted(df[field].dropna().unique().tolist())
+            feature_columns += [f"{field}_{category}" for category in categories[1:]]
+        return cls(feature_columns + TEMPORAL_FEATURES)
+
+    def __init__(self, feature_columns):
+        self.feature_columns = list(feature_columns)
+        self.category_index = {}
+        self.numeric_index = {}
+
+        for i, col in enumerate(self.feature_columns):
+            if col in TEMPORAL_FEATURES:
+                self.numeric_index[col] = i
+                continue
+            for field in CATEGORICAL_FEATURES:
+                prefix = f"{field}_"
+                if col.startswith(prefix):
+                    self.category_index[(field, col[len(prefix):])] = i
+                    break
+
+    @property
+    def n_features(self):
+        return len(self.feature_columns)
+
+    def category_columns(self, field, values):
+        """Column index for each value of a categorical field (-1 if it has none)"""
+        return np.array([self.category_index.get((field, value), -1) for value in values], dtype=np.intp)
+
+    def encode(self, record):
+        """Encode one record (keyed by model field names) into a feature row"""
+        return self.encode_many([record])[0]
+
+    def encode_many(self, records):
+        """Encode a list of records into an (n_records, n_features) matrix"""
+        features = np.zeros((len(records), self.n_features), dtype=np.float64)
+
+        rows, cols = [], []
+        for row, record in enumerate(records):
+            for field in CATEGORICAL_FEATURES:
+                i = self.category_index.get((field, record.get(field)))
+                if i is not None:
+                    rows.append(row)
+                    cols.append(i)
+        features[rows, cols] = 1
+
+        for field, i in self.numeric_index.items():
+            features[:, i] = [record.get(field, 0) for record in records]
+
+        return features
+
+    def transform(self, df, sparse_output=True):
+        """Encode a whole frame, as a CSR matrix by default.
+
+        One-hot columns are looked up once per category and then gathered
+        by integer code, so no per-row Python work or dense dummy frame is
+        needed; each row stores at most six non-zeros.
+        """
+        n = len(df)
+        rows, cols, values = [], [], []
+
+        for field in CATEGORICAL_FEATURES:
+            series = df[field]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes, labels = series.cat.codes.to_numpy(), series.cat.categories
+            else:
+                codes, labels = pd.factorize(series)
+            # Code -1 (missing) picks the trailing -1 sentinel
+            lookup = np.append(self.category_columns(field, labels), -1)
+            field_cols = lookup[codes]
+            has_col = field_cols >= 0
+            rows.append(np.flatnonzero(has_col))
+            cols.append(field_cols[has_col])
+            values.append(np.ones(has_col.sum(), dtype=np.float32))
+
+        for field, i in self.numeric_index.items():
+            field_values = df[field].to_numpy(dtype=np.float32)
+            nonzero = np.flatnonzero(field_values)
+            rows.append(nonzero)
+            cols.append(np.full(len(nonzero), i))
+            values.append(field_values[nonzero])
+
+        rows, cols, values = np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+
+        if not sparse_output:
+            features = np.zeros((n, self.n_features), dtype=np.float32)
+            features[rows, cols] = values
+            return features
+
+        return sparse.csr_matrix((values, (rows, cols)), shape=(n, self.n_features), dtype=np.float32)
@@ -0,0 +1,94 @@
+"""Watermarked aggregate state for incremental pipeline runs.
+
+311 extracts grow by appending rows, so after a run the pipeline records
+how far into the CSV it has read (a byte offset on a line boundary) along
+with the chart aggregates. The next incremental run checks that the
+already-read prefix is unchanged, reads only the bytes past the watermark
+and folds them into the stored aggregates.
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from data_pipeline.aggregates import ChartAggregates
+from data_pipeline.atomic import atomic_write
+
+STATE_VERSION = 1
+
+# Bytes just before the watermark that are hashed to detect a rewritten file
+PREFIX_CHECK_BYTES = 1 << 16
+
+
+def csv_watermark(csv_path):
+    """Byte offset just past the last complete line of the file"""
+    size = os.path.getsize(csv_path)
+    with open(csv_path, 'rb') as f:
+        position = size
+        while position > 0:
+            start = max(0, position - PREFIX_CHECK_BYTES)
+            f.seek(start)
+            block = f.read(position - start)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            position = start
+    return 0
+
+
+def read_header(csv_path):
+    with open(csv_path, 'rb') as f:
+        return f.readline()
+
+
+def prefix_digest(csv_path, offset):
+    """SHA-256 of the header and the bytes immediately before offset"""
+    digest = hashlib.sha256(read_header(csv_path))
+    with open(csv_path, 'rb') as f:
+        start = max(0, offset - PREFIX_CHECK_BYTES)
+        f.seek(start)
+        digest.update(f.read(offset - start))
+    return digest.hexdigest()
+
+
+class AggregateState:
+    """Chart aggregates plus the CSV watermark they cover"""
+
+    def __init__(self, csv_path, offset, aggregates, digest=None):
+        self.csv_path = str(csv_path)
+        self.offset = offset
+        self.aggregates = aggregates
+        self.digest = digest
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('version') != STATE_VERSION:
+            return None
+
+        source = state['source']
+        return cls(source['path'], source['offset'], ChartAggregates.from_state(state['aggregates']), source['prefix_sha256'])
+
+    def save(self, path):
+        with atomic_write(path) as f:
+            json.dump({
+                "version": STATE_VERSION,
+                "source": {
+                    "path": self.csv_path,
+                    "offset": self.offset,
+                    "prefix_sha256": prefix_digest(self.csv_path, self.offset)
+                },
+                "aggregates": self.aggregates.to_state()
+            }, f)
+
+    def matches(self, csv_path):
+        """True if csv_path still starts with the bytes this state was built from"""
+        if Path(csv_path).resolve() != Path(self.csv_path).resolve():
+            return False
+        if not os.path.exists(csv_path) or os.path.getsize(csv_path) < self.offset:
+            return False
+        return prefix_digest(csv_path, self.offset) == self.digest
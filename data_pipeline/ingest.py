@@ -0,0 +1,207 @@
+"""Reading and cleaning raw 311 CSV extracts, from one file or many.
+
+The City publishes one extract per year (SR2019.csv ... SR2025.csv), and
+older years differ in small ways: header spelling ("Created Date",
+"service_request_type"), encoding (UTF-8, with or without a BOM, or
+latin1) and occasionally the timestamp format. CsvSource reads a file's
+header and picks its encoding once; clean_chunks maps its columns onto
+the canonical names and applies the pipeline's cleaning, so every file
+yields the same typed chunks.
+
+For parallel ingestion, each file is split into byte ranges that end on a
+newline outside quoted fields, so a quoted value containing a line break
+stays in one range, and the ranges are cleaned in a process pool. Everything a
+worker needs is a module-level function of picklable arguments.
+"""
+import codecs
+import glob
+import io
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from data_pipeline.clean_cache import CATEGORICAL_COLUMNS, CleanedDataCache
+from data_pipeline.normalization import normalize_categories
+from data_pipeline.time_features import add_time_features, parse_creation_dates
+
+ESSENTIAL_COLUMNS = ['Status', 'Service Request Type', 'Division', 'Ward', 'Creation Date']
+
+# Header spellings seen across yearly extracts, keyed by column_key(name)
+COLUMN_ALIASES = {
+    'creationdate': 'Creation Date',
+    'createddate': 'Creation Date',
+    'datecreated': 'Creation Date',
+    'status': 'Status',
+    'requeststatus': 'Status',
+    'servicerequesttype': 'Service Request Type',
+    'requesttype': 'Service Request Type',
+    'srtype': 'Service Request Type',
+    'division': 'Division',
+    'ward': 'Ward',
+    'wardname': 'Ward',
+}
+
+# Bytes of each file sampled to choose its encoding
+ENCODING_SAMPLE_BYTES = 4 << 20
+# Target size of the byte ranges cleaned by parallel workers
+RANGE_BYTES = 64 << 20
+
+
+def column_key(name):
+    """Header name reduced to lowercase letters and digits"""
+    return re.sub(r'[^0-9a-z]', '', str(name).lower())
+
+
+def detect_encoding(path, sample_bytes=ENCODING_SAMPLE_BYTES):
+    """utf-8-sig or utf-16 by BOM, utf-8 if a sample decodes as UTF-8, else latin1"""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_bytes)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    # Ignore a multi-byte character cut off at the end of the sample
+    if len(sample) == sample_bytes:
+        sample = sample[:sample.rfind(b'\n') + 1]
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin1'
+
+
+def strip_categories(series):
+    """Strip whitespace from a categorical column's labels rather than every row"""
+    stripped = series.cat.categories.str.strip()
+    if stripped.is_unique:
+        return series.cat.rename_categories(stripped)
+    return series.astype(str).str.strip().astype('category')
+
+
+def resolve_sources(csv_path):
+    """CSV files for a path, a directory of CSVs or a glob pattern, in sorted order"""
+    path = Path(csv_path)
+    if path.is_dir():
+        paths = sorted(path.glob('*.csv'))
+    elif glob.has_magic(str(csv_path)):
+        paths = sorted(Path(p) for p in glob.glob(str(csv_path)))
+    else:
+        return [path]
+    if not paths:
+        raise ValueError(f"No CSV files match {csv_path}")
+    return paths
+
+
+class CsvSource:
+    """One raw extract: its encoding, header and raw -> canonical column names"""
+
+    def __init__(self, path, encoding=None):
+        self.path = Path(path)
+        self.encoding = encoding or detect_encoding(self.path)
+        self.header = list(pd.read_csv(self.path, encoding=self.encoding, nrows=0).columns)
+
+        self.columns = {}
+        for raw in self.header:
+            canonical = COLUMN_ALIASES.get(column_key(raw))
+            if canonical is not None and canonical not in self.columns.values():
+                self.columns[raw] = canonical
+        missing = [col for col in ESSENTIAL_COLUMNS if col not in self.columns.values()]
+        if missing:
+            raise ValueError(f"{self.path} is missing required columns: {missing}")
+
+    @property
+    def splittable(self):
+        """Byte ranges split on newlines only work for single-byte-newline encodings"""
+        return self.encoding != 'utf-16'
+
+    def byte_ranges(self, target_bytes=RANGE_BYTES, block_bytes=1 << 20):
+        """[start, end) offsets past the header of about target_bytes each.
+
+        Quote characters are counted from the start of each range, and a
+        range only ends on a newline where that count is even, i.e. outside
+        a quoted field (a doubled "" escape counts twice).
+        """
+        size = os.path.getsize(self.path)
+        with open(self.path, 'rb') as f:
+            f.readline()
+            start = f.tell()
+            ranges = []
+            while start < size:
+                quotes = 0
+                remaining = target_bytes
+                while remaining > 0:
+                    block = f.read(min(block_bytes, remaining))
+                    if not block:
+                        break
+                    quotes += block.count(b'"')
+                    remaining -= len(block)
+                # Finish the current line, and keep going while inside a quoted field
+                line = f.readline()
+                quotes += line.count(b'"')
+                while quotes % 2 and line:
+                    line = f.readline()
+                    quotes += line.count(b'"')
+                end = f.tell()
+                ranges.append((start, end))
+                start = end
+        return ranges
+
+
+def clean_chunks(source, chunksize, start_offset=0, end_offset=None, stats=None):
+    """Yield cleaned chunks of a CsvSource.
+
+    Each chunk is read with explicit columns and categorical dtypes and
+    parsed with a fixed date format. With start_offset, only the rows in
+    the byte range [start_offset, end_offset) are read; the range must
+    start on a line boundary past the header. stats['rows_read'] counts
+    the raw rows.
+    """
+    data, header_args = source.path, {}
+    if start_offset:
+        with open(source.path, 'rb') as f:
+            f.seek(start_offset)
+            data = io.BytesIO(f.read() if end_offset is None else f.read(end_offset - start_offset))
+        header_args = {'header': None, 'names': source.header}
+
+    raw_names = {canonical: raw for raw, canonical in source.columns.items()}
+    reader = pd.read_csv(
+        data,
+        **header_args,
+        encoding=source.encoding,
+        encoding_errors='replace',
+        on_bad_lines="skip",
+        usecols=[raw_names[col] for col in ESSENTIAL_COLUMNS],
+        dtype={raw_names[col]: 'category' for col in CATEGORICAL_COLUMNS} | {raw_names['Creation Date']: str},
+        chunksize=chunksize
+    )
+
+    for chunk in reader:
+        chunk = chunk.rename(columns=source.columns)
+        if stats is not None:
+            stats['rows_read'] = stats.get('rows_read', 0) + len(chunk)
+
+        chunk = chunk.dropna(subset=ESSENTIAL_COLUMNS)
+        raw_dates = chunk['Creation Date']
+        chunk['Creation Date'] = parse_creation_dates(raw_dates)
+        if len(chunk) and chunk['Creation Date'].isna().all():
+            # Some older extracts are not ISO 8601; infer their format instead
+            chunk['Creation Date'] = parse_creation_dates(raw_dates, date_format='mixed')
+        chunk = chunk.dropna(subset=['Creation Date'])
+
+        chunk['Status'] = strip_categories(chunk['Status'])
+        chunk['Service Request Type'] = normalize_categories(chunk['Service Request Type'])
+        add_time_features(chunk)
+
+        yield chunk
+
+
+def clean_range(source, start_offset, end_offset, chunksize):
+    """Worker task: cleaned chunks for one byte range of a source (the whole file if start_offset is 0)"""
+    return list(clean_chunks(source, chunksize, start_offset, end_offset))
+
+
+def read_cached(csv_path):
+    """Worker task: a source's cleaned frame from its Parquet cache"""
+    return [CleanedDataCache(csv_path).read()]
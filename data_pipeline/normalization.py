@@ -0,0 +1,58 @@
+"""Canonical service-type labels.
+
+The City's extracts use long names for some service types that the
+dashboard and model know by shorter ones. SERVICE_TYPE_ALIASES maps raw
+labels (after whitespace cleanup) to the canonical label; everything not
+in it is kept as is. The same mapping is applied during ingest, so the
+cached data, charts and training see canonical labels, and to prediction
+input, so requests using either name hit the same model features.
+
+Columns are normalized through their categories: a categorical column's
+few hundred labels are mapped, not its millions of rows.
+"""
+import numpy as np
+import pandas as pd
+
+SERVICE_TYPE_ALIASES = {
+    "Waste or Illegal Dumping on Private Property": "Illegal Dumping on Private Property",
+    "Long Grass and Prohibited Plants on Private Property": "Unlawful Grass/Plants on Private Property",
+    "Waste Set Out - Wrong Location / Time/ Day": "Incorrect Waste Set Out (Location/day/time)",
+    "Residential: Bin: Wrong Delivery or Bin Return": "Wrong Residential Bin Delivery",
+    "Missing / Damaged Street or Traffic Sign": "Faulty Traffic Sign",
+    "Property Standards and Maintenance Violations": "Property Maintenance Violations",
+}
+
+
+def normalize_service_type(value):
+    """Canonical label for one service type: whitespace collapsed, then aliases applied"""
+    if not isinstance(value, str):
+        return value
+    value = " ".join(value.split())
+    return SERVICE_TYPE_ALIASES.get(value, value)
+
+
+def normalize_categories(series, normalize=normalize_service_type):
+    """Apply normalize to each distinct label of a column, keeping the column's dtype.
+
+    Labels of a categorical column that normalize to the same value are
+    merged into one category; other columns are factorized first.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = pd.factorize(series)
+        labels = np.array([normalize(label) for label in uniques] + [None], dtype=object)
+        return pd.Series(labels[codes], index=series.index, name=series.name, dtype=series.dtype)
+
+    categories = series.cat.categories
+    normalized = pd.Index([normalize(label) for label in categories])
+    if normalized.equals(categories):
+        return series
+    if normalized.is_unique:
+        return series.cat.rename_categories(normalized)
+
+    # Merge aliases: recode onto the distinct normalized labels
+    merged = pd.Index(normalized.unique()).sort_values()
+    mapping = merged.get_indexer(normalized)
+    codes = series.cat.codes.to_numpy()
+    new_codes = mapping[codes]
+    new_codes[codes < 0] = -1
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories=merged), index=series.index, name=series.name)
@@ -0,0 +1,172 @@
+"""Precomputed completion probabilities for every prediction input.
+
+All model inputs are categorical (service type, division, ward, weekday,
+hour bucket, month), so the pipeline can score every valid combination once
+after training, by walking the compiled forest's trees over the grid of
+categories, and store the probabilities in a dense array. The backend
+memory-maps the array and answers predictions with an index lookup, without
+importing sklearn or unpickling the forest.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+from data_pipeline.atomic import atomic_write
+from data_pipeline.features import HOUR_BUCKETS
+
+TABLE_FILENAME = "prediction_table.npy"
+INDEX_FILENAME = "prediction_table.json"
+
+WEEKDAYS = list(range(7))
+MONTHS = list(range(1, 13))
+
+
+class PredictionTable:
+    """Completion probabilities indexed by category codes.
+
+    The array has shape (service/division pair, ward, weekday, hour bucket,
+    month). Only (service type, division) pairs observed in training are
+    enumerated, which keeps the table around 20 MB instead of five times that.
+    """
+
+    def __init__(self, probabilities, service_divisions, wards, hours=HOUR_BUCKETS):
+        self.probabilities = probabilities
+        self.service_divisions = [tuple(pair) for pair in service_divisions]
+        self.wards = list(wards)
+        self.hours = list(hours)
+
+        self.pair_index = {pair: i for i, pair in enumerate(self.service_divisions)}
+        self.ward_index = {ward: i for i, ward in enumerate(self.wards)}
+        self.hour_index = {hour: i for i, hour in enumerate(self.hours)}
+
+    @property
+    def shape(self):
+        return (len(self.service_divisions), len(self.wards), len(WEEKDAYS), len(self.hours), len(MONTHS))
+
+    @classmethod
+    def build(cls, forest, encoder, service_divisions, wards, batch_size=256):
+        """Score every combination with the compiled forest.
+
+        Each feature varies along a single axis of the table (the one-hot
+        columns along the pair or ward axis, Weekday, Hour and Month along
+        their own), so the cells reaching any tree node are a product of one
+        mask per axis. Walking each tree once with those masks finds every
+        leaf's block of cells, and the blocks are summed batch_size leaves at
+        a time as a (pair, ward) by (weekday, hour, month) matrix product,
+        without encoding or traversing a row per cell.
+        """
+        table = cls(None, service_divisions, wards)
+        shape = table.shape
+
+        # Feature values along each axis, one row per position on the axis
+        axes = [np.zeros((n, encoder.n_features), dtype=np.float32) for n in shape]
+        pairs = np.arange(len(table.service_divisions))
+        for field, position in (('Service Request Type', 0), ('Division', 1)):
+            cols = encoder.category_columns(field, [pair[position] for pair in table.service_divisions])
+            axes[0][pairs[cols >= 0], cols[cols >= 0]] = 1
+        cols = encoder.category_columns('Ward', table.wards)
+        axes[1][np.arange(len(table.wards))[cols >= 0], cols[cols >= 0]] = 1
+        temporal = {'Weekday': (2, WEEKDAYS), 'Hour': (3, table.hours), 'Month': (4, MONTHS)}
+        for field, i in encoder.numeric_index.items():
+            axis, values = temporal[field]
+            axes[axis][:, i] = values
+
+        # Features that are zero in every cell get axis -1
+        feature_axis = np.full(encoder.n_features, -1)
+        for axis, values in enumerate(axes):
+            feature_axis[(values != 0).any(axis=0)] = axis
+        columns = [np.ascontiguousarray(values.T) for values in axes]
+
+        leaves = []
+        everything = tuple(np.ones(n, dtype=bool) for n in shape)
+        for root in forest.roots:
+            stack = [(int(root), everything)]
+            while stack:
+                node, masks = stack.pop()
+                left, right = int(forest.left[node]), int(forest.right[node])
+                if left < 0:
+                    leaves.append((forest.value[node], masks))
+                    continue
+
+                feature = forest.feature[node]
+                axis = feature_axis[feature]
+                if axis < 0:
+                    stack.append((left if 0 <= forest.threshold[node] else right, masks))
+                    continue
+
+                go_left = columns[axis][feature] <= forest.threshold[node]
+                for child, side in ((left, go_left), (right, ~go_left)):
+                    mask = masks[axis] & side
+                    if mask.any():
+                        stack.append((child, masks[:axis] + (mask,) + masks[axis + 1:]))
+
+        totals = np.zeros((shape[0] * shape[1], int(np.prod(shape[2:]))))
+        for start in range(0, len(leaves), batch_size):
+            batch = leaves[start:start + batch_size]
+            places = np.stack([value * np.outer(pair, ward).ravel() for value, (pair, ward, *_) in batch])
+            times = np.stack([
+                (weekday[:, None, None] & hour[:, None] & month).ravel()
+                for _, (_, _, weekday, hour, month) in batch
+            ])
+            totals += places.T @ times
+
+        table.probabilities = (totals / len(forest.roots)).reshape(shape).astype(np.float32)
+        return table
+
+    def save(self, directory):
+        directory = Path(directory)
+        with atomic_write(directory / TABLE_FILENAME, 'wb') as f:
+            np.save(f, self.probabilities)
+        with atomic_write(directory / INDEX_FILENAME) as f:
+            json.dump({
+                "service_divisions": [list(pair) for pair in self.service_divisions],
+                "wards": self.wards,
+                "hours": self.hours
+            }, f)
+
+    @classmethod
+    def exists(cls, directory):
+        directory = Path(directory)
+        return (directory / TABLE_FILENAME).exists() and (directory / INDEX_FILENAME).exists()
+
+    @classmethod
+    def remove(cls, directory):
+        """Delete the table, so the backend does not serve an older model's probabilities"""
+        directory = Path(directory)
+        (directory / TABLE_FILENAME).unlink(missing_ok=True)
+        (directory / INDEX_FILENAME).unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Load a saved table; with mmap the array pages are shared between processes"""
+        directory = Path(directory)
+        with open(directory / INDEX_FILENAME, 'r') as f:
+            index = json.load(f)
+        probabilities = np.load(directory / TABLE_FILENAME, mmap_mode='r' if mmap else None)
+        table = cls(probabilities, index['service_divisions'], index['wards'], index['hours'])
+        if probabilities.shape != table.shape:
+            raise ValueError(f"{INDEX_FILENAME} does not match {TABLE_FILENAME}")
+        return table
+
+    def lookup_many(self, model_records):
+        """Completion probability per record, NaN where the combination is not in the table"""
+        n = len(model_records)
+        pair = np.empty(n, dtype=np.intp)
+        ward = np.empty(n, dtype=np.intp)
+        weekday = np.empty(n, dtype=np.intp)
+        hour = np.empty(n, dtype=np.intp)
+        month = np.empty(n, dtype=np.intp)
+
+        for i, record in enumerate(model_records):
+            pair[i] = self.pair_index.get((record['Service Request Type'], record['Division']), -1)
+            ward[i] = self.ward_index.get(record['Ward'], -1)
+            weekday[i] = record['Weekday'] if record['Weekday'] in WEEKDAYS else -1
+            hour[i] = self.hour_index.get(record['Hour'], -1)
+            month[i] = record['Month'] - 1 if record['Month'] in MONTHS else -1
+
+        found = (pair >= 0) & (ward >= 0) & (weekday >= 0) & (hour >= 0) & (month >= 0)
+
+        probabilities = np.full(n, np.nan)
+        probabilities[found] = self.probabilities[pair[found], ward[found], weekday[found], hour[found], month[found]]
+        return probabilities
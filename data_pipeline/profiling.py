@@ -0,0 +1,198 @@
+"""Per-stage wall time, CPU time, memory and row counts for a pipeline run"""
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from data_pipeline.atomic import atomic_write
+
+REPORT_FILENAME = "run_report.json"
+
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+def current_rss_mb():
+    """Resident set size now, or None where /proc is not available"""
+    try:
+        with open(PROC_STATUS) as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb():
+    """High-water mark of the resident set size since the last reset"""
+    try:
+        with open(PROC_STATUS) as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def reset_peak_rss():
+    """Reset the RSS high-water mark so the next reading covers one stage.
+
+    Only Linux supports this; elsewhere the peak stays process-wide.
+    """
+    try:
+        with open(PROC_CLEAR_REFS, "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def frame_memory_mb(df):
+    """Memory held by a DataFrame's columns and index, counting string contents"""
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def child_cpu_seconds():
+    """CPU time of finished child processes, e.g. the tuning process pool"""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Stage:
+    """Measurements for one stage; code inside the stage may set rows and frame_mb"""
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.frame_mb = None
+        self.details = {}
+
+    def measure_frame(self, df):
+        """Record the rows and memory of the frame the stage produced"""
+        self.rows = len(df)
+        self.frame_mb = _round(frame_memory_mb(df))
+
+    def to_dict(self):
+        record = {"name": self.name, "rows": self.rows, **self.details}
+        if self.frame_mb is not None:
+            record["frame_mb"] = self.frame_mb
+        return record
+
+
+class StageProfiler:
+    """Time named pipeline stages and write them to run_report.json.
+
+    Every stage records wall time, CPU time (this process's threads plus
+    any child processes that finished during it), RSS at the end and the
+    peak RSS during the stage; stages that build the cleaned frame also
+    record its size (frame_mb). With profile_dir, each stage is also run
+    under cProfile and dumped to ``<profile_dir>/NN-<stage>.prof``; with
+    trace_memory, tracemalloc records the stage's peak Python allocation
+    and its largest allocation sites. Both slow the pipeline down
+    noticeably and are off by default.
+    """
+
+    def __init__(self, profile_dir=None, trace_memory=False, top_allocations=10):
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.trace_memory = trace_memory
+        self.top_allocations = top_allocations
+        self.stages = []
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        record = Stage(name, rows)
+        per_stage_peak = reset_peak_rss()
+
+        profiler = None
+        if self.profile_dir is not None:
+            profiler = cProfile.Profile()
+        if self.trace_memory:
+            tracemalloc.start()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        child_cpu_start = child_cpu_seconds()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record.details.update({
+                "wall_seconds": round(time.perf_counter() - wall_start, 4),
+                "cpu_seconds": round(time.process_time() - cpu_start + child_cpu_seconds() - child_cpu_start, 4),
+                "rss_mb": _round(current_rss_mb()),
+                "peak_rss_mb": _round(peak_rss_mb()),
+                "peak_rss_scope": "stage" if per_stage_peak else "process",
+            })
+
+            if self.trace_memory:
+                snapshot = tracemalloc.take_snapshot()
+                record.details["tracemalloc_peak_mb"] = _round(tracemalloc.get_traced_memory()[1] / (1024 * 1024))
+                tracemalloc.stop()
+                record.details["top_allocations"] = [
+                    {"site": str(stat.traceback[0]), "size_mb": _round(stat.size / (1024 * 1024)), "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:self.top_allocations]
+                ]
+
+            if profiler is not None:
+                self.profile_dir.mkdir(parents=True, exist_ok=True)
+                profile_path = self.profile_dir / f"{len(self.stages):02d}-{name}.prof"
+                profiler.dump_stats(profile_path)
+                record.details["profile"] = str(profile_path)
+
+            self.stages.append(record)
+
+    def report(self, status="success", error=None, **run_info):
+        report = {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "status": status,
+            "total_wall_seconds": round(time.perf_counter() - self._start, 4),
+            "peak_rss_mb": _round(max((s.details["peak_rss_mb"] or 0 for s in self.stages), default=None)),
+            "pid": os.getpid(),
+            **run_info,
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+        if error is not None:
+            report["error"] = error
+        return report
+
+    def save(self, path, **report_args):
+        with atomic_write(path) as f:
+            json.dump(self.report(**report_args), f, indent=2)
+
+    def print_summary(self):
+        print("\n Stage timings:")
+        print(f"   {'stage':<20}{'wall s':>9}{'cpu s':>9}{'peak MB':>10}{'frame MB':>10}{'rows':>12}")
+        for stage in self.stages:
+            details = stage.details
+            peak = details["peak_rss_mb"]
+            print(f"   {stage.name:<20}{details['wall_seconds']:>9.2f}{details['cpu_seconds']:>9.2f}"
+                  f"{'' if peak is None else f'{peak:.0f}':>10}{'' if stage.frame_mb is None else stage.frame_mb:>10}"
+                  f"{'' if stage.rows is None else stage.rows:>12}")
+
+
+def _round(value, digits=1):
+    return None if value is None else round(value, digits)
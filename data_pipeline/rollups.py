@@ -0,0 +1,214 @@
+"""Request counts per hour, day, week and month for time-series charts.
+
+The rollups are derived from the data cube and hold one dense row of
+bucket counts per series: all requests, then each ward, division and
+service type. A chart over any date range reads one row slice at the
+coarsest resolution that still gives it enough points, so a multi-year
+range is a few hundred monthly or weekly points rather than a scan over
+cells or records. All four resolutions are stored as fields of a single
+record in one .npy file, with the series labels and bucket ranges in a
+JSON sidecar, and memory-mapped by the backend.
+
+Buckets are numbered from the Unix epoch: hours and days since
+1970-01-01, weeks starting on Monday, and calendar months since 1970-01.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_pipeline.atomic import atomic_write
+from data_pipeline.cube import day_number
+
+ROLLUPS_FILENAME = "rollups.npy"
+ROLLUPS_META_FILENAME = "rollups.json"
+
+# Finest first; auto resolution picks the first that fits the point budget
+RESOLUTIONS = ('hour', 'day', 'week', 'month')
+SERIES_DIMENSIONS = ('ward', 'division', 'service_type')
+DEFAULT_MAX_POINTS = 400
+# Upper bound on the points in one response when the resolution is explicit
+POINT_LIMIT = 10_000
+
+
+def bucket_numbers(resolution, days, hours):
+    """Bucket numbers of a resolution for arrays of day numbers and hours"""
+    days = np.asarray(days, dtype=np.int64)
+    if resolution == 'hour':
+        return days * 24 + np.asarray(hours, dtype=np.int64)
+    if resolution == 'day':
+        return days
+    if resolution == 'week':
+        # 1970-01-01 was a Thursday, so Monday-based weeks start 3 days earlier
+        return (days + 3) // 7
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def bucket_labels(resolution, numbers):
+    """ISO labels for bucket numbers: the hour, the day, the week's Monday or the month"""
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if resolution == 'hour':
+        return [label[:13] + ":00" for label in numbers.astype('datetime64[h]').astype(str)]
+    if resolution == 'day':
+        return numbers.astype('datetime64[D]').astype(str).tolist()
+    if resolution == 'week':
+        return (numbers * 7 - 3).astype('datetime64[D]').astype(str).tolist()
+    return numbers.astype('datetime64[M]').astype(str).tolist()
+
+
+def rollups_dtype(series_count, lengths):
+    """A single record with one (series, buckets) count matrix per resolution"""
+    return np.dtype([
+        (resolution, '<i4', (series_count, lengths[resolution])) for resolution in RESOLUTIONS
+    ])
+
+
+def time_point(value, end=False):
+    """(day number, hour) of a date or datetime; a bare date as end means its last hour"""
+    timestamp = pd.Timestamp(value)
+    if end and len(str(value)) <= 10:
+        return day_number(timestamp), 23
+    return day_number(timestamp), timestamp.hour
+
+
+class TimeRollups:
+    """Bucketed request counts per series at four resolutions"""
+
+    def __init__(self, counts, labels, first_buckets):
+        self.counts = counts
+        self.labels = {name: list(labels[name]) for name in SERIES_DIMENSIONS}
+        self.first_buckets = {resolution: int(first_buckets[resolution]) for resolution in RESOLUTIONS}
+
+        # Row 0 is every request; each dimension's rows follow in label order
+        self.series_index = {}
+        row = 1
+        for name in SERIES_DIMENSIONS:
+            self.series_index[name] = {label: row + i for i, label in enumerate(self.labels[name])}
+            row += len(self.labels[name])
+        self.series_count = row
+
+    @classmethod
+    def from_cube(cls, cube):
+        """Sum the cube's cells into every series and resolution"""
+        labels = {name: cube.labels[name] for name in SERIES_DIMENSIONS}
+        offsets = np.cumsum([1] + [len(labels[name]) for name in SERIES_DIMENSIONS])
+        series_count = int(offsets[-1])
+        count = np.asarray(cube.count, dtype=np.int64)
+
+        # Every cell counts towards the total row and one row per dimension
+        rows = np.concatenate(
+            [np.zeros(len(count), dtype=np.int64)]
+            + [np.asarray(cube.cells[name], dtype=np.int64) + offsets[i] for i, name in enumerate(SERIES_DIMENSIONS)]
+        )
+        weights = np.tile(count, 1 + len(SERIES_DIMENSIONS))
+
+        first_buckets, lengths, matrices = {}, {}, {}
+        for resolution in RESOLUTIONS:
+            buckets = bucket_numbers(resolution, cube.day, cube.hour)
+            first = int(buckets.min()) if len(buckets) else 0
+            length = int(buckets.max()) - first + 1 if len(buckets) else 0
+            columns = np.tile(buckets - first, 1 + len(SERIES_DIMENSIONS))
+            matrices[resolution] = np.bincount(
+                rows * length + columns, weights=weights, minlength=series_count * length
+            ).astype(np.int32).reshape(series_count, length)
+            first_buckets[resolution] = first
+            lengths[resolution] = length
+
+        counts = np.zeros((), dtype=rollups_dtype(series_count, lengths))
+        for resolution in RESOLUTIONS:
+            counts[resolution] = matrices[resolution]
+        return cls(counts, labels, first_buckets)
+
+    def bucket_range(self, resolution):
+        """First and last stored bucket numbers of a resolution"""
+        first = self.first_buckets[resolution]
+        return first, first + self.counts[resolution].shape[1] - 1
+
+    def _row(self, ward=None, division=None, service_type=None):
+        selected = {name: value for name, value in
+                    (('ward', ward), ('division', division), ('service_type', service_type)) if value is not None}
+        if len(selected) > 1:
+            raise ValueError("Time series are kept per ward, division or service type, not combinations - "
+                             "use /api/query with group_by=date for those")
+        if not selected:
+            return 0, None
+        (name, value), = selected.items()
+        if value not in self.series_index[name]:
+            raise ValueError(f"Unknown {name}: {value}")
+        return self.series_index[name][value], {"dimension": name, "value": value}
+
+    def series(self, start=None, end=None, resolution='auto', ward=None, division=None, service_type=None,
+               max_points=DEFAULT_MAX_POINTS):
+        """Counts per bucket between start and end (inclusive), zero-filled.
+
+        start and end default to the first and last stored day. With
+        resolution 'auto', the finest resolution with at most max_points
+        buckets in the range is used.
+        """
+        if resolution != 'auto' and resolution not in RESOLUTIONS:
+            raise ValueError(f"resolution must be 'auto' or one of {', '.join(RESOLUTIONS)}")
+        row, series = self._row(ward, division, service_type)
+
+        first_day, last_day = self.bucket_range('day')
+        start_day, start_hour = time_point(start) if start is not None else (first_day, 0)
+        end_day, end_hour = time_point(end, end=True) if end is not None else (last_day, 23)
+        if (end_day, end_hour) < (start_day, start_hour):
+            raise ValueError("end is before start")
+
+        def bucket_span(res):
+            return (int(bucket_numbers(res, [start_day], [start_hour])[0]),
+                    int(bucket_numbers(res, [end_day], [end_hour])[0]))
+
+        if resolution == 'auto':
+            resolution = next(
+                (res for res in RESOLUTIONS if np.diff(bucket_span(res))[0] + 1 <= max_points), RESOLUTIONS[-1]
+            )
+        first, last = bucket_span(resolution)
+        if last - first + 1 > POINT_LIMIT:
+            raise ValueError(f"{last - first + 1} {resolution} buckets requested; use a coarser resolution "
+                             f"or a shorter range (limit {POINT_LIMIT})")
+
+        # Copy the stored overlap into a zero-filled range
+        counts = np.zeros(last - first + 1, dtype=np.int64)
+        stored_first, stored_last = self.bucket_range(resolution)
+        lo, hi = max(first, stored_first), min(last, stored_last)
+        if lo <= hi:
+            matrix = self.counts[resolution]
+            counts[lo - first:hi - first + 1] = matrix[row, lo - stored_first:hi - stored_first + 1]
+
+        return {
+            "resolution": resolution,
+            "series": series,
+            "buckets": bucket_labels(resolution, np.arange(first, last + 1)),
+            "counts": counts.tolist(),
+            "total": int(counts.sum())
+        }
+
+    def save(self, directory):
+        directory = Path(directory)
+        with atomic_write(directory / ROLLUPS_FILENAME, 'wb') as f:
+            np.save(f, self.counts)
+        with atomic_write(directory / ROLLUPS_META_FILENAME) as f:
+            json.dump({
+                "series_count": self.series_count,
+                "first_buckets": self.first_buckets,
+                "labels": self.labels
+            }, f)
+
+    @classmethod
+    def exists(cls, directory):
+        directory = Path(directory)
+        return (directory / ROLLUPS_FILENAME).exists() and (directory / ROLLUPS_META_FILENAME).exists()
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        directory = Path(directory)
+        with open(directory / ROLLUPS_META_FILENAME, 'r') as f:
+            meta = json.load(f)
+        counts = np.load(directory / ROLLUPS_FILENAME, mmap_mode='r' if mmap else None)
+        rollups = cls(counts, meta['labels'], meta['first_buckets'])
+        if any(counts[resolution].shape[0] != meta['series_count'] for resolution in RESOLUTIONS) \
+                or rollups.series_count != meta['series_count']:
+            raise ValueError(f"{ROLLUPS_META_FILENAME} does not match {ROLLUPS_FILENAME}")
+        return rollups
@@ -0,0 +1,370 @@
+"""SQLite store of cleaned 311 records for SQL aggregations and range scans.
+
+One row per request with the creation time as Unix seconds, the hour and
+weekday, and integer ids for ward, division, service type and status (the
+id -> label mapping lives in a small labels table). Indexes on created_at,
+ward, division and service type make date-range scans and filtered
+aggregations cheap, and SQLite gives any number of concurrent readers
+without loading the records into memory.
+
+The database is built under a temporary name and renamed into place, so
+readers keep seeing the previous store until the new one is complete.
+"""
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from data_pipeline.aggregation import Dimension
+from data_pipeline.cube import LABEL_DIMENSIONS, QUERY_DIMENSIONS, WEEKDAY_NAMES, filter_values, parse_date
+from data_pipeline.features import COMPLETED_STATUSES
+
+STORE_FILENAME = "records.sqlite"
+
+SCHEMA = """
+CREATE TABLE labels (
+    dimension TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (dimension, id)
+);
+CREATE TABLE requests (
+    created_at INTEGER NOT NULL,
+    hour INTEGER NOT NULL,
+    weekday INTEGER NOT NULL,
+    ward INTEGER NOT NULL,
+    division INTEGER NOT NULL,
+    service_type INTEGER NOT NULL,
+    status INTEGER NOT NULL
+);
+CREATE TABLE source (
+    csv_path TEXT NOT NULL,
+    watermark INTEGER NOT NULL
+);
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS requests_created_at ON requests (created_at);
+CREATE INDEX IF NOT EXISTS requests_ward ON requests (ward);
+CREATE INDEX IF NOT EXISTS requests_division ON requests (division);
+CREATE INDEX IF NOT EXISTS requests_service_type ON requests (service_type);
+"""
+
+# SQL for each query dimension, over the requests table
+DIMENSION_SQL = {
+    **{name: name for name in LABEL_DIMENSIONS},
+    'date': "date(created_at, 'unixepoch')",
+    'month': "strftime('%Y-%m', created_at, 'unixepoch')",
+    'weekday': "weekday",
+    'hour': "hour",
+}
+
+
+def to_unix_seconds(value):
+    """Unix seconds for a naive timestamp, keeping its wall-clock time"""
+    return int(parse_date(value).timestamp())
+
+
+def from_unix_seconds(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class RecordStore:
+    """Read and write access to records.sqlite in one directory"""
+
+    def __init__(self, directory):
+        self.path = Path(directory) / STORE_FILENAME
+        self.labels = {name: [] for name in LABEL_DIMENSIONS}
+        self.label_index = {name: {} for name in LABEL_DIMENSIONS}
+
+    @classmethod
+    def exists(cls, directory):
+        return (Path(directory) / STORE_FILENAME).exists()
+
+    @classmethod
+    def remove(cls, directory):
+        """Delete the store, so it is not served alongside newer outputs"""
+        (Path(directory) / STORE_FILENAME).unlink(missing_ok=True)
+
+    @classmethod
+    def open(cls, directory):
+        """Open an existing store for queries, checking that it is readable"""
+        store = cls(directory)
+        with closing(store.connect()) as connection:
+            connection.execute("SELECT 1 FROM requests LIMIT 1").fetchall()
+        return store
+
+    def connect(self, read_only=True, path=None):
+        path = Path(path or self.path)
+        if read_only:
+            connection = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True,
+                                         timeout=30, check_same_thread=False)
+        else:
+            connection = sqlite3.connect(path, timeout=30)
+        return connection
+
+    @staticmethod
+    def read_labels(connection):
+        """id -> label lists per dimension.
+
+        Readers take the labels from the connection they query with, since
+        a pipeline run may have renamed a new store into place since open.
+        """
+        labels = {name: [] for name in LABEL_DIMENSIONS}
+        for dimension, label_id, name in connection.execute(
+                "SELECT dimension, id, name FROM labels ORDER BY dimension, id"):
+            labels[dimension].append(name)
+        return labels
+
+    def read_source(self):
+        """(csv_path, watermark) of the single CSV the store holds, or None.
+
+        Stores built from several files, or before the source was
+        recorded, have none and cannot be appended to.
+        """
+        try:
+            with closing(self.connect()) as connection:
+                row = connection.execute("SELECT csv_path, watermark FROM source").fetchone()
+        except sqlite3.Error:
+            return None
+        return None if row is None else (row[0], row[1])
+
+    def matches(self, csv_path, watermark):
+        """True if the store holds csv_path up to exactly this watermark"""
+        source = self.read_source()
+        return source is not None and source == (str(Path(csv_path).resolve()), watermark)
+
+    def _load_labels(self, connection):
+        self.labels = self.read_labels(connection)
+        self.label_index = {
+            name: {label: i for i, label in enumerate(labels)} for name, labels in self.labels.items()
+        }
+
+    # Writing
+
+    def _insert(self, connection, df):
+        """Insert a cleaned frame (with Creation Date and Hour columns)"""
+        df = df.dropna(subset=['Creation Date'])
+        if df.empty:
+            return 0
+
+        columns = {}
+        valid = np.ones(len(df), dtype=bool)
+        new_labels = []
+        for name, column in LABEL_DIMENSIONS.items():
+            codes, labels = Dimension(name, column).encode(df[column])
+            index = self.label_index[name]
+            ids = []
+            for label in labels:
+                if label not in index:
+                    index[label] = len(self.labels[name])
+                    self.labels[name].append(label)
+                    new_labels.append((name, index[label], label))
+                ids.append(index[label])
+            ids = np.array(ids, dtype=np.int64)
+            valid &= codes >= 0
+            columns[name] = ids[np.maximum(codes, 0)] if len(ids) else np.zeros(len(df), dtype=np.int64)
+
+        created = df['Creation Date']
+        rows = zip(
+            (created.to_numpy(dtype='datetime64[s]').astype(np.int64))[valid].tolist(),
+            df['Hour'].to_numpy()[valid].tolist(),
+            created.dt.dayofweek.to_numpy()[valid].tolist(),
+            *(columns[name][valid].tolist() for name in LABEL_DIMENSIONS)
+        )
+        connection.executemany("INSERT INTO labels VALUES (?, ?, ?)", new_labels)
+        connection.executemany(
+            "INSERT INTO requests (created_at, hour, weekday, ward, division, service_type, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return int(valid.sum())
+
+    def write_chunks(self, chunks, csv_path=None, watermark=None):
+        """Build a new store from cleaned frames as they are yielded, then pass them on.
+
+        Rows are loaded without indexes into a temporary file, the indexes
+        are built once at the end and the file is renamed over the store.
+        csv_path and watermark record the single CSV prefix the rows came
+        from, which incremental runs check before appending.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        self.labels = {name: [] for name in LABEL_DIMENSIONS}
+        self.label_index = {name: {} for name in LABEL_DIMENSIONS}
+
+        try:
+            with closing(self.connect(read_only=False, path=tmp_path)) as connection:
+                connection.execute("PRAGMA journal_mode = OFF")
+                connection.execute("PRAGMA synchronous = OFF")
+                connection.executescript(SCHEMA)
+                for chunk in chunks:
+                    self._insert(connection, chunk)
+                    yield chunk
+                if csv_path is not None and watermark is not None:
+                    connection.execute("INSERT INTO source VALUES (?, ?)", (str(Path(csv_path).resolve()), watermark))
+                connection.executescript(INDEXES)
+                connection.execute("ANALYZE")
+                connection.commit()
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def write(self, df, chunksize=500_000, csv_path=None, watermark=None):
+        chunks = (df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize))
+        for _ in self.write_chunks(chunks, csv_path, watermark):
+            pass
+
+    def append(self, chunks, watermark):
+        """Add records to an existing store in one transaction, moving its watermark"""
+        with closing(self.connect(read_only=False)) as connection:
+            self._load_labels(connection)
+            with connection:
+                inserted = sum(self._insert(connection, chunk) for chunk in chunks)
+                connection.execute("UPDATE source SET watermark = ?", (watermark,))
+        return inserted
+
+    # Reading
+
+    def summary(self):
+        """Total records and the creation date range"""
+        with closing(self.connect()) as connection:
+            total, first, last = connection.execute(
+                "SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM requests").fetchone()
+        return total, {
+            "start": None if first is None else from_unix_seconds(first),
+            "end": None if last is None else from_unix_seconds(last)
+        }
+
+    @staticmethod
+    def _ranked(connection, labels, name, n=None):
+        """(label, count) pairs for a label dimension, largest first, ties by label"""
+        counts = [
+            (labels[name][label_id], count)
+            for label_id, count in connection.execute(f"SELECT {name}, COUNT(*) FROM requests GROUP BY {name}")
+        ]
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        return counts if n is None else counts[:n]
+
+    def chart_data(self):
+        """Chart payload in the format of ChartAggregates.to_chart_data, computed in SQL"""
+        with closing(self.connect()) as connection:
+            labels = self.read_labels(connection)
+            daily = connection.execute(
+                f"SELECT {DIMENSION_SQL['date']} AS day, COUNT(*) FROM requests "
+                "GROUP BY day ORDER BY day DESC LIMIT 30").fetchall()[::-1]
+            wards = self._ranked(connection, labels, 'ward', 15)
+            statuses = self._ranked(connection, labels, 'status')
+            services = self._ranked(connection, labels, 'service_type', 15)
+            divisions = self._ranked(connection, labels, 'division', 10)
+            hourly = dict(connection.execute("SELECT hour, COUNT(*) FROM requests GROUP BY hour"))
+
+        return {
+            "time_series": {"dates": [day for day, _ in daily], "counts": [count for _, count in daily]},
+            "ward_distribution": {"wards": [w for w, _ in wards], "counts": [c for _, c in wards]},
+            "status_distribution": {"statuses": [s for s, _ in statuses], "counts": [c for _, c in statuses]},
+            "service_types": {"types": [s for s, _ in services], "counts": [c for _, c in services]},
+            "division_distribution": {"divisions": [d for d, _ in divisions], "counts": [c for _, c in divisions]},
+            "hourly_pattern": {"hours": list(range(24)), "counts": [hourly.get(hour, 0) for hour in range(24)]}
+        }
+
+    @staticmethod
+    def _filter_sql(label_index, name, values):
+        """WHERE clause and parameters keeping the given values of a dimension"""
+        values = filter_values(name, values)
+        if name in LABEL_DIMENSIONS:
+            params = [label_index[name][value] for value in values if value in label_index[name]]
+        elif name == 'month':
+            params = [str(np.datetime64(value, 'M')) for value in values]
+        else:
+            params = values
+        if not params:
+            return "0", []
+        return f"{DIMENSION_SQL[name]} IN ({', '.join('?' * len(params))})", params
+
+    def query(self, filters=None, group_by=(), start=None, end=None, sort=None, limit=None):
+        """Same query and result shape as DataCube.query, answered from the records.
+
+        start and end may carry a time of day; a bare date as end includes
+        that whole day.
+        """
+        filters = filters or {}
+        group_by = list(group_by)
+        unknown = [name for name in list(filters) + group_by if name not in QUERY_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown dimensions: {', '.join(unknown)} (expected {', '.join(QUERY_DIMENSIONS)})")
+        if len(set(group_by)) != len(group_by):
+            raise ValueError("group_by dimensions must be distinct")
+        if sort not in (None, 'count', 'key'):
+            raise ValueError("sort must be 'count' or 'key'")
+
+        with closing(self.connect()) as connection:
+            labels = self.read_labels(connection)
+            label_index = {name: {label: i for i, label in enumerate(values)} for name, values in labels.items()}
+
+            where, params = [], []
+            if start is not None:
+                where.append("created_at >= ?")
+                params.append(to_unix_seconds(start))
+            if end is not None:
+                end_seconds = to_unix_seconds(end)
+                if len(str(end)) <= 10:
+                    end_seconds += 86_400
+                    where.append("created_at < ?")
+                else:
+                    where.append("created_at <= ?")
+                params.append(end_seconds)
+            for name, values in filters.items():
+                clause, values = self._filter_sql(label_index, name, values)
+                where.append(clause)
+                params.extend(values)
+
+            completed_ids = [label_index['status'][s] for s in COMPLETED_STATUSES if s in label_index['status']]
+            completed_sql = f"SUM(status IN ({', '.join(map(str, completed_ids))}))" if completed_ids else "0"
+            where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+
+            if not group_by:
+                count, completed = connection.execute(
+                    f"SELECT COUNT(*), {completed_sql} FROM requests{where_sql}", params).fetchone()
+                return {"total": self._totals(count, completed or 0)}
+
+            keys = [f"{DIMENSION_SQL[name]} AS k{i}" for i, name in enumerate(group_by)]
+            key_names = [f"k{i}" for i in range(len(group_by))]
+            rows = connection.execute(
+                f"SELECT {', '.join(keys)}, COUNT(*), {completed_sql} "
+                f"FROM requests{where_sql} GROUP BY {', '.join(key_names)}",
+                params
+            ).fetchall()
+
+        # Label ids follow insertion order, so groups are decoded and then
+        # ordered in Python to match the cube: by label, or by count with
+        # ties broken by label
+        n = len(group_by)
+        decoded = [
+            tuple(labels[name][key] if name in LABEL_DIMENSIONS else key for name, key in zip(group_by, row[:n]))
+            + row[n:]
+            for row in rows
+        ]
+        if sort is None:
+            sort = 'count' if any(name in LABEL_DIMENSIONS for name in group_by) else 'key'
+        decoded.sort(key=(lambda row: (-row[n], row[:n])) if sort == 'count' else (lambda row: row[:n]))
+
+        groups = []
+        for row in decoded[:limit]:
+            group = {
+                name: WEEKDAY_NAMES[key].title() if name == 'weekday' else key
+                for name, key in zip(group_by, row)
+            }
+            groups.append({**group, **self._totals(row[n], row[n + 1] or 0)})
+        total = self._totals(sum(row[n] for row in rows), sum(row[n + 1] or 0 for row in rows))
+        return {"total": total, "groups": groups, "group_count": len(rows)}
+
+    @staticmethod
+    def _totals(count, completed):
+        return {
+            "count": count,
+            "completed": completed,
+            "completion_rate": round(completed / count, 4) if count else None
+        }
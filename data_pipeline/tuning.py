@@ -0,0 +1,105 @@
+"""Time-bounded hyperparameter search for the completion model.
+
+Candidates from a parameter grid are evaluated with stratified k-fold
+cross-validation, one (candidate, fold) fit per task in a process pool.
+The training data is sent to each worker once, through the pool
+initializer, rather than with every task. No new fits are started once
+the time budget is spent; fits already running are allowed to finish and
+the best fully cross-validated candidate wins.
+"""
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import f1_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+PARAM_GRID = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [10, 15, 20, None],
+    'min_samples_leaf': [1, 5, 10]
+}
+
+# Set in each worker process by _init_worker
+_X = None
+_y = None
+_folds = None
+
+
+def _init_worker(X, y, folds):
+    global _X, _y, _folds
+    _X, _y, _folds = X, y, folds
+
+
+def _fit_fold(base_params, params, fold):
+    train_idx, test_idx = _folds[fold]
+    model = RandomForestClassifier(**{**base_params, **params, 'n_jobs': 1})
+    model.fit(_X[train_idx], _y[train_idx])
+    return f1_score(_y[test_idx], model.predict(_X[test_idx]))
+
+
+def search_hyperparameters(X, y, base_params, param_grid=PARAM_GRID, time_budget=600,
+                           cv=3, n_workers=None, random_state=42):
+    """Cross-validate grid candidates in random order until the time budget runs out
+
+    Returns a dict with the best parameters, its mean F1, every completed
+    candidate's scores and the search timing.
+    """
+    start = time.perf_counter()
+    deadline = start + time_budget
+    n_workers = n_workers or os.cpu_count()
+
+    candidates = list(ParameterGrid(param_grid))
+    random.Random(random_state).shuffle(candidates)
+    y = np.asarray(y)
+    folds = list(StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state).split(np.zeros(len(y)), y))
+
+    scores = {i: [] for i in range(len(candidates))}
+    pending = {}
+    tasks = ((i, fold) for i in range(len(candidates)) for fold in range(cv))
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=(X, y, folds)) as pool:
+        def submit_next():
+            if time.perf_counter() >= deadline:
+                return False
+            task = next(tasks, None)
+            if task is None:
+                return False
+            i, fold = task
+            pending[pool.submit(_fit_fold, base_params, candidates[i], fold)] = i
+            return True
+
+        # Keep every worker busy with one queued task behind it
+        for _ in range(2 * n_workers):
+            if not submit_next():
+                break
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                scores[pending.pop(future)].append(future.result())
+                submit_next()
+
+    results = [
+        {"params": candidates[i], "mean_f1": float(np.mean(fold_scores))}
+        for i, fold_scores in scores.items()
+        if len(fold_scores) == cv
+    ]
+    if not results:
+        raise RuntimeError(f"No candidate finished {cv}-fold cross-validation within {time_budget}s")
+
+    results.sort(key=lambda result: result["mean_f1"], reverse=True)
+    return {
+        "best_params": results[0]["params"],
+        "best_mean_f1": results[0]["mean_f1"],
+        "candidates_evaluated": len(results),
+        "candidates_total": len(candidates),
+        "cv_folds": cv,
+        "workers": n_workers,
+        "time_budget_seconds": time_budget,
+        "search_seconds": round(time.perf_counter() - start, 2),
+        "results": results
+    }
@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from data_pipeline.time_features import add_time_features
+
+
+@pytest.fixture
+def cleaned_frame():
+    """A small cleaned frame in the pipeline's compact layout"""
+    rng = np.random.default_rng(0)
+    rows = 2000
+    seconds = rng.integers(0, 90 * 86400, rows)
+    df = pd.DataFrame({
+        'Status': pd.Categorical(rng.choice(['Closed', 'Completed', 'In-progress', 'New'], rows)),
+        'Service Request Type': pd.Categorical(rng.choice(['Pothole', 'Graffiti', 'Noise', 'Litter'], rows)),
+        'Division': pd.Categorical(rng.choice(['Transportation Services', 'Solid Waste Management'], rows)),
+        'Ward': pd.Categorical(rng.choice(['Ward A (01)', 'Ward B (02)', 'Ward C (03)'], rows)),
+        'Creation Date': pd.Timestamp('2025-01-01') + pd.to_timedelta(seconds, unit='s'),
+    })
+    return add_time_features(df)
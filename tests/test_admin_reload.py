@@ -0,0 +1,17 @@
+import backend.app as backend_app
+
+
+def test_reload_disabled_without_token(monkeypatch):
+    monkeypatch.setattr(backend_app, 'ADMIN_TOKEN', None)
+    monkeypatch.setattr(backend_app, 'load_data', lambda: True)
+    response = backend_app.app.test_client().post('/api/admin/reload')
+    assert response.status_code == 403
+
+
+def test_reload_requires_matching_token(monkeypatch):
+    monkeypatch.setattr(backend_app, 'ADMIN_TOKEN', 'secret')
+    monkeypatch.setattr(backend_app, 'load_data', lambda: True)
+    client = backend_app.app.test_client()
+    assert client.post('/api/admin/reload').status_code == 403
+    assert client.post('/api/admin/reload', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    assert client.post('/api/admin/reload', headers={'X-Admin-Token': 'secret'}).status_code == 200
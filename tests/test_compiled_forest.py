@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from data_pipeline.compiled_forest import CompiledForest
+from data_pipeline.features import COMPLETED_STATUSES, FeatureEncoder
+
+
+@pytest.fixture
+def fitted(cleaned_frame):
+    encoder = FeatureEncoder.from_frame(cleaned_frame)
+    X = encoder.transform(cleaned_frame)
+    y = cleaned_frame['Status'].isin(COMPLETED_STATUSES).astype(np.int8)
+    X_train, X_test, y_train, _ = train_test_split(X, y, test_size=0.3, random_state=42, stratify=y)
+    model = RandomForestClassifier(
+        n_estimators=20, max_depth=8, min_samples_leaf=5, random_state=42, class_weight='balanced'
+    ).fit(X_train, y_train)
+    return model, encoder, X_test
+
+
+def test_matches_sklearn(fitted):
+    model, encoder, X_test = fitted
+    forest = CompiledForest.from_sklearn(model, encoder.feature_columns)
+    expected = model.predict_proba(X_test)
+    assert np.allclose(forest.predict_proba(X_test.toarray()), expected)
+    assert np.allclose(forest.predict_proba(X_test.toarray(), batch_size=7), expected)
+    assert forest.verify(model, X_test) <= 1e-9
+
+
+def test_memory_mapped_load_matches_sklearn(fitted, tmp_path):
+    model, encoder, X_test = fitted
+    CompiledForest.from_sklearn(model, encoder.feature_columns).save(tmp_path)
+
+    forest = CompiledForest.load(tmp_path)
+    assert isinstance(forest.nodes, np.memmap)
+    assert forest.feature_columns == encoder.feature_columns
+    assert np.allclose(forest.predict_proba(X_test.toarray()), model.predict_proba(X_test))
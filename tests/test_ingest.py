@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from data_pipeline.ingest import CsvSource, clean_chunks, clean_range
+
+
+def write_extract(path, rows=300):
+    lines = ['Creation Date,Status,Ward,Service Request Type,Division,Section']
+    for i in range(rows):
+        # Every third row has a quoted note spanning lines, some with escaped quotes
+        note = '\n'.join(f'line {k}, ""quoted""' for k in range(8))
+        section = f'"District {i}\n{note}"' if i % 3 == 0 else f'District {i}'
+        lines.append(f'2025-01-{i % 28 + 1:02d}T{i % 24:02d}:15:00,Closed,"Ward {i % 5} (0{i % 5})",'
+                     f'Pothole,Transportation Services,{section}')
+    path.write_text('\n'.join(lines) + '\n')
+
+
+@pytest.mark.parametrize('target_bytes', [97, 200, 333, 1000])
+def test_byte_ranges_do_not_split_quoted_newlines(tmp_path, target_bytes):
+    path = tmp_path / 'SR.csv'
+    write_extract(path)
+    source = CsvSource(path)
+    ranges = source.byte_ranges(target_bytes=target_bytes)
+    assert len(ranges) > 10
+    data = path.read_bytes()
+    assert all(data[start:start + 8] == b'2025-01-' for start, _ in ranges)
+
+    whole = pd.concat(clean_chunks(source, chunksize=10_000), ignore_index=True)
+    parts = pd.concat(
+        [chunk for start, end in ranges for chunk in clean_range(source, start, end, 10_000)], ignore_index=True)
+    assert len(whole) == len(parts) == 300
+    for column in ['Creation Date', 'Ward', 'Hour']:
+        assert (whole[column].astype(str) == parts[column].astype(str)).all()
@@ -0,0 +1,42 @@
+from backend.metrics import Metrics
+
+
+def worker_metrics(directory, pid, requests, hits):
+    metrics = Metrics(multiprocess_dir=directory)
+    metrics.collect = lambda: (
+        [("citypulse_prediction_cache_hits_total", "Prediction cache hits", hits)],
+        [("citypulse_prediction_cache_size", "Entries in the prediction cache", hits)],
+    )
+    for _ in range(requests):
+        metrics.requests.inc(("/api/health", "GET", "200"))
+        metrics.request_latency.observe(("/api/health", "GET"), 0.002)
+    snapshot = metrics.dump()
+    snapshot["pid"] = pid
+    return metrics, snapshot
+
+
+def test_render_sums_worker_snapshots(tmp_path, monkeypatch):
+    import json
+
+    _, other = worker_metrics(tmp_path, 1, requests=3, hits=5)
+    (tmp_path / "1.json").write_text(json.dumps(other))
+    metrics, _ = worker_metrics(tmp_path, None, requests=2, hits=7)
+
+    body = metrics.render()
+    assert 'citypulse_requests_total{route="/api/health",method="GET",status="200"} 5' in body
+    assert 'citypulse_request_duration_seconds_count{route="/api/health",method="GET"} 5' in body
+    assert "# TYPE citypulse_prediction_cache_hits_total counter" in body
+    assert "citypulse_prediction_cache_hits_total 12" in body
+    assert 'citypulse_prediction_cache_size{worker="1"} 5' in body
+
+    Metrics.mark_process_dead(tmp_path, 1)
+    body = metrics.render()
+    assert "citypulse_prediction_cache_hits_total 12" in body
+    assert 'worker="1"' not in body
+
+
+def test_single_process_render(tmp_path):
+    metrics, _ = worker_metrics(None, None, requests=1, hits=2)
+    body = metrics.render()
+    assert "citypulse_prediction_cache_hits_total 2" in body
+    assert "citypulse_prediction_cache_size 2" in body
@@ -0,0 +1,25 @@
+import json
+
+from flask import Flask, request
+
+from backend.precompressed import PrecompressedResponse
+
+app = Flask(__name__)
+payload = PrecompressedResponse(json.dumps({"total_records": 3}).encode(), "2025-06-01T00:00:00")
+
+
+@app.route('/data')
+def data():
+    return payload.respond(request)
+
+
+def test_etag_only_matches_negotiated_encoding():
+    client = app.test_client()
+    gzip_etag = client.get('/data', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+
+    assert client.get('/data', headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzip_etag}).status_code == 304
+    identity = client.get('/data', headers={'Accept-Encoding': 'identity', 'If-None-Match': gzip_etag})
+    assert identity.status_code == 200
+    assert identity.get_json() == {"total_records": 3}
+    assert identity.headers['ETag'] != gzip_etag
+    assert client.get('/data', headers={'If-None-Match': '*'}).status_code == 304
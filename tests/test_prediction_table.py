@@ -0,0 +1,43 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from data_pipeline.compiled_forest import CompiledForest
+from data_pipeline.features import COMPLETED_STATUSES, FeatureEncoder
+from data_pipeline.prediction_table import MONTHS, WEEKDAYS, PredictionTable
+
+
+def test_build_matches_sklearn(cleaned_frame):
+    encoder = FeatureEncoder.from_frame(cleaned_frame)
+    y = cleaned_frame['Status'].isin(COMPLETED_STATUSES).astype(np.int8)
+    model = RandomForestClassifier(
+        n_estimators=20, max_depth=8, min_samples_leaf=5, random_state=42, class_weight='balanced'
+    ).fit(encoder.transform(cleaned_frame), y)
+    forest = CompiledForest.from_sklearn(model, encoder.feature_columns)
+
+    service_divisions = sorted(
+        cleaned_frame[['Service Request Type', 'Division']].drop_duplicates().itertuples(index=False, name=None)
+    )[:6] + [("Unknown service", "Unknown division")]
+    wards = sorted(cleaned_frame['Ward'].unique())[:4] + ["Unknown ward"]
+    table = PredictionTable.build(forest, encoder, service_divisions, wards, batch_size=7)
+
+    records = [
+        {'Service Request Type': service, 'Division': division, 'Ward': ward,
+         'Weekday': weekday, 'Hour': hour, 'Month': month}
+        for service, division in service_divisions for ward in wards
+        for weekday in WEEKDAYS for hour in table.hours for month in MONTHS
+    ]
+    expected = model.predict_proba(encoder.encode_many(records))[:, 1]
+    assert table.probabilities.shape == table.shape
+    assert np.allclose(table.probabilities.ravel(), expected, atol=1e-6)
+    assert np.allclose(table.lookup_many(records), expected, atol=1e-6)
+
+
+def test_remove_deletes_saved_table(tmp_path):
+    table = PredictionTable(np.zeros((1, 1, 7, 5, 12), dtype=np.float32), [("Pothole", "Roads")], ["Ward 1"])
+    table.save(tmp_path)
+    assert PredictionTable.exists(tmp_path)
+
+    PredictionTable.remove(tmp_path)
+    assert not PredictionTable.exists(tmp_path)
+    assert list(tmp_path.iterdir()) == []
+    PredictionTable.remove(tmp_path)
@@ -0,0 +1,64 @@
+import pytest
+
+import backend.app as backend_app
+from data_pipeline.cube import CubeBuilder
+
+
+@pytest.fixture
+def cube(cleaned_frame):
+    return CubeBuilder().update(cleaned_frame).build()
+
+
+@pytest.fixture
+def client(cube, monkeypatch):
+    monkeypatch.setattr(backend_app, 'data_cube', cube)
+    return backend_app.app.test_client()
+
+
+def test_filters_match_frame(cube, cleaned_frame):
+    result = cube.query(filters={'ward': ['Ward A (01)'], 'hour': ['5', 6], 'weekday': ['monday', 2]})
+    df = cleaned_frame
+    expected = df[(df['Ward'] == 'Ward A (01)') & df['Hour'].isin([5, 6]) & df['Weekday'].isin([0, 2])]
+    assert result['total']['count'] == len(expected)
+
+    result = cube.query(filters={'month': ['2025-02']})
+    assert result['total']['count'] == int((df['Month'] == 2).sum())
+
+
+@pytest.mark.parametrize('filters', [
+    {'hour': [None]},
+    {'hour': [[1]]},
+    {'hour': [24]},
+    {'hour': [True]},
+    {'weekday': [7]},
+    {'weekday': ['someday']},
+    {'ward': [None]},
+    {'ward': [{'name': 'Ward A (01)'}]},
+    {'month': [3]},
+    {'month': ['March']},
+])
+def test_invalid_filter_values_are_rejected(cube, client, filters):
+    with pytest.raises(ValueError):
+        cube.query(filters=filters)
+    response = client.post('/api/query', json={'filters': filters})
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+@pytest.mark.parametrize('body', [
+    {'start': ['x']},
+    {'end': {'day': 1}},
+    {'start': 20250101},
+    {'start': ''},
+    {'group_by': 5},
+    {'group_by': [['ward']]},
+    {'sort': ['count']},
+])
+def test_invalid_query_options_are_rejected(client, body):
+    response = client.post('/api/query', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+def test_empty_bound_in_query_string_is_rejected(client):
+    assert client.get('/api/query?start=').status_code == 400
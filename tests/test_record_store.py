@@ -0,0 +1,64 @@
+import pytest
+
+import backend.app as backend_app
+from data_pipeline.cube import CubeBuilder
+from data_pipeline.store import RecordStore
+
+
+@pytest.fixture
+def store(cleaned_frame, tmp_path):
+    store = RecordStore(tmp_path)
+    store.write(cleaned_frame.iloc[:1500], csv_path=tmp_path / 'SR.csv', watermark=100)
+    return store
+
+
+def test_query_matches_cube(store, cleaned_frame):
+    store.append([cleaned_frame.iloc[1500:]], watermark=200)
+    cube = CubeBuilder().update(cleaned_frame).build()
+    query = {'filters': {'hour': ['5', 6], 'weekday': ['monday']}, 'group_by': ['ward', 'month']}
+    assert store.query(**query) == cube.query(**query)
+
+
+def test_source_watermark(store, cleaned_frame, tmp_path):
+    assert store.matches(tmp_path / 'SR.csv', 100)
+    assert not store.matches(tmp_path / 'other.csv', 100)
+
+    store.append([cleaned_frame.iloc[1500:]], watermark=200)
+    assert not store.matches(tmp_path / 'SR.csv', 100)
+    assert store.matches(tmp_path / 'SR.csv', 200)
+
+    RecordStore.remove(tmp_path)
+    assert not RecordStore.exists(tmp_path)
+    assert store.read_source() is None
+
+
+def test_store_without_source_cannot_be_extended(cleaned_frame, tmp_path):
+    store = RecordStore(tmp_path)
+    store.write(cleaned_frame)
+    assert store.read_source() is None
+    assert not store.matches(tmp_path / 'SR.csv', 100)
+
+
+@pytest.mark.parametrize('filters', [{'hour': [None]}, {'weekday': [[1]]}, {'ward': [None]}, {'month': [{}]}])
+def test_invalid_filter_values_are_rejected(store, monkeypatch, filters):
+    with pytest.raises(ValueError):
+        store.query(filters=filters)
+    monkeypatch.setattr(backend_app, 'record_store', store)
+    response = backend_app.app.test_client().post('/api/store/query', json={'filters': filters})
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('bounds', [{'start': ['x']}, {'end': {'day': 1}}, {'start': ''}, {'end': None, 'start': 'never'}])
+def test_invalid_bounds_are_rejected(store, monkeypatch, bounds):
+    with pytest.raises(ValueError):
+        store.query(**bounds)
+
+
+@pytest.mark.parametrize('endpoint', ['/api/query', '/api/store/query'])
+@pytest.mark.parametrize('body', [{'start': ['x']}, {'end': {'day': 1}}, {'start': 20250101}])
+def test_non_string_bounds_are_rejected(store, cleaned_frame, monkeypatch, endpoint, body):
+    monkeypatch.setattr(backend_app, 'record_store', store)
+    monkeypatch.setattr(backend_app, 'data_cube', CubeBuilder().update(cleaned_frame).build())
+    response = backend_app.app.test_client().post(endpoint, json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'status': 'error', 'message': f"{next(iter(body))} must be a string"}
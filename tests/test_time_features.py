@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from data_pipeline.time_features import parse_creation_dates, time_features
+
+
+def test_matches_dt_accessors():
+    values = pd.Series(['2025-03-01T23:30:00', '2025-01-06 08:05:00', '2024-12-31T00:00:00', 'not a date'])
+    parsed = parse_creation_dates(values)
+    features = time_features(parsed)
+    valid = parsed.notna().to_numpy()
+    assert (features['Hour'][valid] == parsed.dt.hour[valid]).all()
+    assert (features['Weekday'][valid] == parsed.dt.dayofweek[valid]).all()
+    assert (features['Month'][valid] == parsed.dt.month[valid]).all()
+    assert features['Hour'][~valid].tolist() == [-1]
+
+
+def test_tz_aware_input_keeps_local_wall_time():
+    aware = pd.to_datetime(pd.Series(['2025-03-01T23:30:00-05:00']))
+    assert time_features(aware)['Hour'].tolist() == aware.dt.hour.tolist() == [23]
+    assert time_features(pd.DatetimeIndex(aware))['Weekday'].tolist() == [5]
+
+
+def test_parse_mixed_offsets():
+    parsed = parse_creation_dates(pd.Series(
+        ['2025-03-01T23:30:00-05:00', '2025-07-02T01:00:00-04:00', '2025-07-02T01:00:00Z', '2025-07-02T02:00:00']))
+    assert parsed.dt.tz is None
+    assert time_features(parsed)['Hour'].tolist() == [23, 1, 1, 2]
+    assert np.array_equal(time_features(parsed)['Month'], [3, 7, 7, 7])
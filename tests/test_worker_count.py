@@ -0,0 +1,21 @@
+import argparse
+import os
+
+import pytest
+
+from data_pipeline.data_pipeline import n_jobs_arg, worker_count
+
+
+def test_joblib_style_n_jobs(monkeypatch):
+    monkeypatch.setattr(os, 'cpu_count', lambda: 8)
+    assert worker_count(None) == 8
+    assert worker_count(-1) == 8
+    assert worker_count(-2) == 7
+    assert worker_count(-20) == 1
+    assert worker_count(3) == 3
+
+
+def test_zero_n_jobs_is_rejected():
+    with pytest.raises(argparse.ArgumentTypeError):
+        n_jobs_arg("0")
+    assert n_jobs_arg("-2") == -2